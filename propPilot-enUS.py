@@ -1,60 +1,984 @@
+# Only cheap standard modules are imported here. Heavier ones (smtplib, email,
+# csv, gzip, concurrent.futures, tabulate, colorama...) are imported inside
+# the functions that need them, so a quick command starts in milliseconds.
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import re
-import subprocess
 import sys
-import smtplib
-from email.mime.text import MIMEText
 import json
-import csv
+import hashlib
+import functools
+from collections import OrderedDict
+import time
+import threading
+import atexit
+from contextlib import contextmanager
+
+APP_VERSION = "4.0"
+
+# Third-party libraries used by the interactive interface
+DEPENDENCIES = ['colorama', 'tabulate']
+
+# Cold-start budget, in milliseconds, checked by --benchmark-startup
+STARTUP_BUDGET_MS = 150
 
 # --- Dependency Installation Functions ---
 
+def missing_dependencies():
+    """Returns the required libraries that are not installed, without importing them."""
+    import importlib.util
+    return [dep for dep in DEPENDENCIES if importlib.util.find_spec(dep) is None]
+
 def install_dependencies():
     """Installs required libraries if they are not already installed."""
-    dependencies = ['colorama', 'tabulate']
-    for dep in dependencies:
-        try:
-            __import__(dep)
+    import subprocess
+    for dep in DEPENDENCIES:
+        if dep not in missing_dependencies():
             print(f"✅ Library '{dep}' is already installed.")
-        except ImportError:
-            print(f"Installing library '{dep}'...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
-                print(f"✅ Library '{dep}' installed successfully!")
-            except subprocess.CalledProcessError:
-                print(f"❌ Error installing library '{dep}'. Please install it manually with 'pip install {dep}' and run the script again.")
-                sys.exit(1)
+            continue
+        print(f"Installing library '{dep}'...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
+            print(f"✅ Library '{dep}' installed successfully!")
+        except subprocess.CalledProcessError:
+            print(f"❌ Error installing library '{dep}'. Please install it manually with 'pip install {dep}' and run the script again.")
+            sys.exit(1)
+
+def tabulate(*args, **kwargs):
+    """Formats a table with the tabulate library, imported on first use."""
+    from tabulate import tabulate as format_table
+    return format_table(*args, **kwargs)
 
-install_dependencies()
+def init_terminal():
+    """Lets colorama translate the ANSI colors on Windows consoles."""
+    try:
+        from colorama import init
+    except ImportError:
+        return
+    init(autoreset=True)
 
-# From this point on, libraries are guaranteed to be installed
-from colorama import init, Fore, Back, Style
-from tabulate import tabulate
+def clear_screen():
+    """Clears the terminal with an ANSI escape sequence instead of spawning a shell."""
+    print("\033[2J\033[H", end="", flush=True)
 
-# Initialize colorama for all systems
-init(autoreset=True)
+# Colors and styles to simulate an old green terminal (the ANSI codes of
+# colorama's Fore.GREEN, Back.BLACK and Style.RESET_ALL)
+GREEN = '\033[32m'
+BLACK = '\033[40m'
+RESET_ALL = '\033[0m'
 
-# Colors and styles to simulate an old green terminal
-GREEN = Fore.GREEN
-BLACK = Back.BLACK
-RESET_ALL = Style.RESET_ALL
+# Host part of the URL validation pattern: domain name, localhost or IPv4 address
+URL_HOST_PATTERN = (
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
+    r'localhost|'
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+)
 
 # Regular expression for URL validation
 URL_PATTERN = re.compile(
     r'^(?:http|ftp)s?://'
-    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
-    r'localhost|'
-    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+    + URL_HOST_PATTERN +
     r'(?::\d+)?'
     r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
+# Fast URL validation: URL_PATTERN's layout with the host reduced to a run of ASCII
+# host characters (captured, then checked on its own against URL_HOST_REGEX) and
+# no case folding; a URL it accepts is valid exactly when its host is
+URL_FAST_PATTERN = re.compile(r'(?:[Hh][Tt][Tt][Pp]|[Ff][Tt][Pp])[Ss]?://([A-Za-z0-9.-]*)(?::[0-9]+)?(?:/?|[/?]\S+)$')
+URL_HOST_REGEX = re.compile(URL_HOST_PATTERN, re.IGNORECASE)
+
+# Distinct hosts whose validation result is kept in memory
+URL_HOST_CACHE_SIZE = 4096
+
+# Links on which bench-urls checks that validate_url agrees with is_valid_url:
+# boundaries of the host and port syntax, case folding, Unicode digits and
+# characters, whitespace and the trailing newline that '$' lets through
+URL_EDGE_CASES = [
+    "", "http://example.com", "HTTPS://EXAMPLE.COM/", "FtPs://files.example.org/a?b=c",
+    "https://example.com.", "https://example.com:", "https://example.com:8080", "https://example.com:/",
+    "https://example.com?", "https://example.com?q", "https://example.com/a b", "https://example.com/\n",
+    "https://example.com\n", "https://example.com \n", " https://example.com", "https://example.com/\u00e9",
+    "http://localhost", "http://LOCALHOST:8000/x", "http://localhostx", "http://127.0.0.1", "http://999.1.1.1/",
+    "http://1.2.3", "http://1.2.3.4.5", "http://\u0661\u0662\u0667.0.0.1/", "http://example.com:\u0668\u0660",
+    "http://a", "http://a.b", "http://a.bc", "http://a.b-c", "http://a.1234567", "http://-a.com", "http://a-.com",
+    "http://a--b.com", "http://" + "a" * 63 + ".com", "http://" + "a" * 64 + ".com", "http://a..com", "http://.a.com",
+    "http://ex_ample.com", "http://b\u00fccher.de", "http://\u212aelvin.com", "http\u017f://example.com",
+    "https://example.\u212aom", "mailto:someone@example.com", "www.example.com", "https//example.com", "https:/example.com",
+]
+
+# Database file used by the script
+DB_PATH = 'proposal_pilot.db'
+
+# Versioned schema migrations, tracked through PRAGMA user_version.
+# Migration N brings the schema from version N-1 to N. Shipped migrations
+# must never be edited: append a new one instead, so existing databases
+# are upgraded in place the next time the script opens them.
+SCHEMA_MIGRATIONS = [
+    # 1: secondary indexes for the client join, the status reports and the
+    #    "most recently updated first" listing
+    [
+        "CREATE INDEX IF NOT EXISTS idx_proposals_client_id ON proposals(client_id)",
+        "CREATE INDEX IF NOT EXISTS idx_proposals_status_value ON proposals(status, proposal_value)",
+        "CREATE INDEX IF NOT EXISTS idx_proposals_update_date ON proposals(update_date)",
+    ],
+    # 2: FTS5 full-text indexes over clients and proposals, kept in sync by triggers
+    [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+            full_name, email,
+            content='clients', content_rowid='client_id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS proposals_fts USING fts5(
+            project_name, project_description,
+            content='proposals', content_rowid='proposal_id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS clients_fts_insert AFTER INSERT ON clients BEGIN
+            INSERT INTO clients_fts(rowid, full_name, email) VALUES (new.client_id, new.full_name, new.email);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS clients_fts_delete AFTER DELETE ON clients BEGIN
+            INSERT INTO clients_fts(clients_fts, rowid, full_name, email) VALUES ('delete', old.client_id, old.full_name, old.email);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS clients_fts_update AFTER UPDATE OF full_name, email ON clients BEGIN
+            INSERT INTO clients_fts(clients_fts, rowid, full_name, email) VALUES ('delete', old.client_id, old.full_name, old.email);
+            INSERT INTO clients_fts(rowid, full_name, email) VALUES (new.client_id, new.full_name, new.email);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_fts_insert AFTER INSERT ON proposals BEGIN
+            INSERT INTO proposals_fts(rowid, project_name, project_description) VALUES (new.proposal_id, new.project_name, new.project_description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_fts_delete AFTER DELETE ON proposals BEGIN
+            INSERT INTO proposals_fts(proposals_fts, rowid, project_name, project_description) VALUES ('delete', old.proposal_id, old.project_name, old.project_description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_fts_update AFTER UPDATE OF project_name, project_description ON proposals BEGIN
+            INSERT INTO proposals_fts(proposals_fts, rowid, project_name, project_description) VALUES ('delete', old.proposal_id, old.project_name, old.project_description);
+            INSERT INTO proposals_fts(rowid, project_name, project_description) VALUES (new.proposal_id, new.project_name, new.project_description);
+        END""",
+        # Names weigh twice as much as emails/descriptions in the bm25 ranking
+        "INSERT INTO clients_fts(clients_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')",
+        "INSERT INTO proposals_fts(proposals_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')",
+        "INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')",
+        "INSERT INTO proposals_fts(proposals_fts) VALUES ('rebuild')",
+    ],
+    # 3: (filter, update_date) indexes so the filtered proposal browser can
+    #    page without sorting; the client one supersedes idx_proposals_client_id
+    [
+        "CREATE INDEX IF NOT EXISTS idx_proposals_status_update ON proposals(status, update_date)",
+        "CREATE INDEX IF NOT EXISTS idx_proposals_client_update ON proposals(client_id, update_date)",
+        "DROP INDEX IF EXISTS idx_proposals_client_id",
+    ],
+    # 4: data-version counters bumped by every write to proposals, used as
+    #    cache keys by the report engine
+    [
+        """CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+        "INSERT OR IGNORE INTO data_versions (name, version) VALUES ('proposals', 0)",
+        """CREATE TRIGGER IF NOT EXISTS proposals_version_insert AFTER INSERT ON proposals BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'proposals';
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_version_update AFTER UPDATE ON proposals BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'proposals';
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_version_delete AFTER DELETE ON proposals BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = 'proposals';
+        END""",
+    ],
+    # 5: monthly and weekly rollups of proposal count and value per status,
+    #    bucketed by send date and maintained incrementally by triggers.
+    #    Deletions are not subtracted: the rollups count every proposal
+    #    ever registered.
+    [
+        """CREATE TABLE IF NOT EXISTS proposal_rollups (
+            period_type TEXT NOT NULL,
+            period TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            proposal_count INTEGER NOT NULL DEFAULT 0,
+            total_value REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (period_type, period, status)
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_rollup_insert AFTER INSERT ON proposals BEGIN
+            INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            VALUES ('month', COALESCE(strftime('%Y-%m', new.send_date), 'undated'), COALESCE(new.status, 0), 1, COALESCE(new.proposal_value, 0))
+            ON CONFLICT (period_type, period, status) DO UPDATE SET
+                proposal_count = proposal_count + 1,
+                total_value = total_value + excluded.total_value;
+            INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            VALUES ('week', COALESCE(strftime('%Y-W%W', new.send_date), 'undated'), COALESCE(new.status, 0), 1, COALESCE(new.proposal_value, 0))
+            ON CONFLICT (period_type, period, status) DO UPDATE SET
+                proposal_count = proposal_count + 1,
+                total_value = total_value + excluded.total_value;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_rollup_update AFTER UPDATE OF status, proposal_value, send_date ON proposals BEGIN
+            UPDATE proposal_rollups SET
+                proposal_count = proposal_count - 1,
+                total_value = total_value - COALESCE(old.proposal_value, 0)
+            WHERE period_type = 'month'
+              AND period = COALESCE(strftime('%Y-%m', old.send_date), 'undated')
+              AND status = COALESCE(old.status, 0);
+            UPDATE proposal_rollups SET
+                proposal_count = proposal_count - 1,
+                total_value = total_value - COALESCE(old.proposal_value, 0)
+            WHERE period_type = 'week'
+              AND period = COALESCE(strftime('%Y-W%W', old.send_date), 'undated')
+              AND status = COALESCE(old.status, 0);
+            INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            VALUES ('month', COALESCE(strftime('%Y-%m', new.send_date), 'undated'), COALESCE(new.status, 0), 1, COALESCE(new.proposal_value, 0))
+            ON CONFLICT (period_type, period, status) DO UPDATE SET
+                proposal_count = proposal_count + 1,
+                total_value = total_value + excluded.total_value;
+            INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            VALUES ('week', COALESCE(strftime('%Y-W%W', new.send_date), 'undated'), COALESCE(new.status, 0), 1, COALESCE(new.proposal_value, 0))
+            ON CONFLICT (period_type, period, status) DO UPDATE SET
+                proposal_count = proposal_count + 1,
+                total_value = total_value + excluded.total_value;
+        END""",
+        """INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            SELECT 'month', COALESCE(strftime('%Y-%m', send_date), 'undated'), COALESCE(status, 0), COUNT(*), TOTAL(proposal_value)
+            FROM proposals GROUP BY 2, 3""",
+        """INSERT INTO proposal_rollups (period_type, period, status, proposal_count, total_value)
+            SELECT 'week', COALESCE(strftime('%Y-W%W', send_date), 'undated'), COALESCE(status, 0), COUNT(*), TOTAL(proposal_value)
+            FROM proposals GROUP BY 2, 3""",
+    ],
+    # 6: change log of edited rows and per-table high-water marks for the
+    #    incremental (delta) export; new rows are found by their id alone
+    [
+        """CREATE TABLE IF NOT EXISTS change_log (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log(table_name, change_id)",
+        """CREATE TRIGGER IF NOT EXISTS clients_change_log AFTER UPDATE ON clients BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('clients', new.client_id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_change_log AFTER UPDATE ON proposals BEGIN
+            INSERT INTO change_log (table_name, row_id) VALUES ('proposals', new.proposal_id);
+        END""",
+        """CREATE TABLE IF NOT EXISTS export_marks (
+            table_name TEXT PRIMARY KEY,
+            last_row_id INTEGER NOT NULL DEFAULT 0,
+            last_change_id INTEGER NOT NULL DEFAULT 0,
+            exported_at TEXT
+        )""",
+    ],
+    # 7: durable outbox of emails waiting for the background delivery worker
+    [
+        """CREATE TABLE IF NOT EXISTS email_outbox (
+            message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT UNIQUE,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, next_attempt_at)",
+    ],
+    # 8: cached results of link health checks, one row per distinct URL
+    [
+        """CREATE TABLE IF NOT EXISTS link_checks (
+            url TEXT PRIMARY KEY,
+            ok INTEGER NOT NULL,
+            status_code INTEGER,
+            error TEXT,
+            elapsed_ms REAL,
+            checked_at TEXT NOT NULL
+        ) WITHOUT ROWID""",
+    ],
+    # 9: append-only history of status transitions. New proposals start as Sent
+    # on their send date; one inserted in a later status also moves there on
+    # its update date. Existing proposals are backfilled the same way, since
+    # their intermediate transitions were never stored.
+    [
+        """CREATE TABLE IF NOT EXISTS proposal_status_history (
+            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            proposal_id INTEGER NOT NULL,
+            old_status INTEGER,
+            new_status INTEGER,
+            changed_at TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_status_history_proposal ON proposal_status_history(proposal_id, changed_at)",
+        "CREATE INDEX IF NOT EXISTS idx_status_history_changed_at ON proposal_status_history(changed_at)",
+        """INSERT INTO proposal_status_history (proposal_id, old_status, new_status, changed_at)
+            SELECT proposal_id, NULL, 1, COALESCE(send_date, update_date, datetime('now', 'localtime'))
+            FROM proposals
+            UNION ALL
+            SELECT proposal_id, 1, status, COALESCE(update_date, send_date, datetime('now', 'localtime'))
+            FROM proposals WHERE status IS NOT 1
+            ORDER BY 1, 2""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_history_insert AFTER INSERT ON proposals BEGIN
+            INSERT INTO proposal_status_history (proposal_id, old_status, new_status, changed_at)
+            VALUES (new.proposal_id, NULL, 1, COALESCE(new.send_date, new.update_date, datetime('now', 'localtime')));
+            INSERT INTO proposal_status_history (proposal_id, old_status, new_status, changed_at)
+            SELECT new.proposal_id, 1, new.status, COALESCE(new.update_date, new.send_date, datetime('now', 'localtime'))
+            WHERE new.status IS NOT 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS proposals_history_update AFTER UPDATE OF status ON proposals
+        WHEN old.status IS NOT new.status BEGIN
+            INSERT INTO proposal_status_history (proposal_id, old_status, new_status, changed_at)
+            VALUES (new.proposal_id, old.status, new.status, COALESCE(new.update_date, datetime('now', 'localtime')));
+        END""",
+    ],
+    # 10: owner and time of each outbox claim, so that a worker only takes over
+    #     messages whose claim has expired instead of every 'sending' row
+    [
+        "ALTER TABLE email_outbox ADD COLUMN claimed_by TEXT",
+        "ALTER TABLE email_outbox ADD COLUMN claimed_at TEXT",
+    ],
+]
+
+# Maximum number of rows shown for each result group of a search
+SEARCH_RESULT_LIMIT = 50
+
+# Number of proposals shown per screen in the proposal browser
+PROPOSAL_PAGE_SIZE = 20
+
+# Display names of the proposal status codes
+STATUS_LABELS = {1: "Sent", 2: "Negotiation", 3: "Accepted", 4: "Rejected"}
+
+# Proposal columns a bulk update may change, with the menu label of each
+BULK_EDITABLE_COLUMNS = {
+    "status": "Status",
+    "project_name": "Project Name",
+    "project_description": "Description",
+    "proposal_value": "Value",
+    "proposal_link": "Proposal Link",
+    "questionnaire_link": "Questionnaire Link",
+    "contract_link": "Contract Link",
+}
+
+# Report metrics already computed, keyed on (database file, data version)
+_report_cache = {}
+
+# Number of periods shown by the trend report
+TREND_PERIODS = 12
+
+# Rows fetched from SQLite per chunk while exporting to CSV
+EXPORT_CHUNK_SIZE = 5000
+
+# Exportable data sets: name -> (default file, FROM clause, [(column, SQL expression)]).
+# Proposals are read through the all_proposals view, so archived ones are included.
+EXPORT_SOURCES = {
+    "clients": ("clients.csv", "clients", [
+        ("client_id", "client_id"),
+        ("full_name", "full_name"),
+        ("email", "email"),
+        ("phone", "phone"),
+        ("registration_date", "registration_date"),
+    ]),
+    "proposals": ("proposals.csv", "all_proposals", [
+        ("proposal_id", "proposal_id"),
+        ("client_id", "client_id"),
+        ("project_name", "project_name"),
+        ("project_description", "project_description"),
+        ("proposal_value", "proposal_value"),
+        ("status", "status"),
+        ("proposal_link", "proposal_link"),
+        ("questionnaire_link", "questionnaire_link"),
+        ("contract_link", "contract_link"),
+        ("send_date", "send_date"),
+        ("update_date", "update_date"),
+    ]),
+    "proposals_with_client": ("proposals_with_client.csv", "all_proposals p JOIN clients c ON c.client_id = p.client_id", [
+        ("proposal_id", "p.proposal_id"),
+        ("client_id", "p.client_id"),
+        ("client_name", "c.full_name"),
+        ("client_email", "c.email"),
+        ("project_name", "p.project_name"),
+        ("project_description", "p.project_description"),
+        ("proposal_value", "p.proposal_value"),
+        ("status", "p.status"),
+        ("proposal_link", "p.proposal_link"),
+        ("questionnaire_link", "p.questionnaire_link"),
+        ("contract_link", "p.contract_link"),
+        ("send_date", "p.send_date"),
+        ("update_date", "p.update_date"),
+    ]),
+}
+
+# Maximum number of SMTP sessions open at the same time
+SMTP_MAX_SESSIONS = 4
+
+# Seconds to wait on the SMTP server before a connection or command fails
+SMTP_TIMEOUT = 30
+
+# Idle seconds after which a pooled SMTP session is checked with NOOP before reuse
+SMTP_IDLE_CHECK = 30
+
+# Template placeholders such as [client_name]; only lowercase names and underscores
+PLACEHOLDER_PATTERN = re.compile(r'\[([a-z_]+)\]')
+
+# Placeholder names from the Portuguese edition, accepted as aliases
+PLACEHOLDER_ALIASES = {
+    "nome_cliente": "client_name",
+    "email_cliente": "client_email",
+    "nome_projeto": "project_name",
+    "valor_proposta": "proposal_value",
+}
+
+# Number of compiled templates and standard replies kept in memory
+TEMPLATE_CACHE_SIZE = 256
+
+# Number of client records kept in memory
+CLIENT_CACHE_SIZE = 4096
+
+# Seconds a cached client, standard reply or config is trusted before it is read
+# again; edits made through this process invalidate it at once, this only bounds
+# how long an edit made by another process (the API server, a cron job) can go unseen
+READ_CACHE_TTL = 60.0
+
+# Worker threads sending campaign emails; more than the SMTP pool's sessions would only wait
+CAMPAIGN_WORKERS = SMTP_MAX_SESSIONS
+
+# Maximum campaign emails sent per second across all workers (0 for no limit)
+CAMPAIGN_RATE_LIMIT = 10
+
+# Attempts per campaign email, and the delay before the first retry (doubled on each retry)
+CAMPAIGN_MAX_ATTEMPTS = 3
+CAMPAIGN_RETRY_DELAY = 2.0
+
+# Outbox messages claimed per delivery batch, and seconds the worker sleeps when the outbox is empty
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_INTERVAL = 5.0
+
+# Delivery attempts per outbox message, and the backoff between them (doubled each time, capped)
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 3600
+
+# Seconds after which a message left 'sending' by a worker is considered abandoned
+# and may be claimed again; well above the time a full batch can take to send
+OUTBOX_CLAIM_TIMEOUT = 3600
+
+# Records validated and written per executemany batch (and transaction) during bulk imports
+IMPORT_BATCH_SIZE = 50000
+
+# Bulk upserts: clients are matched on email, proposals on proposal_id when one is given
+CLIENT_UPSERT_SQL = """
+    INSERT INTO clients (full_name, email, phone, registration_date) VALUES (?, ?, ?, ?)
+    ON CONFLICT (email) DO UPDATE SET
+        full_name = excluded.full_name,
+        phone = COALESCE(excluded.phone, phone)
+"""
+PROPOSAL_UPSERT_SQL = """
+    INSERT INTO proposals (proposal_id, client_id, project_name, project_description, proposal_value, status,
+                           proposal_link, questionnaire_link, contract_link, send_date, update_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (proposal_id) DO UPDATE SET
+        client_id = excluded.client_id,
+        project_name = excluded.project_name,
+        project_description = excluded.project_description,
+        proposal_value = excluded.proposal_value,
+        status = excluded.status,
+        proposal_link = excluded.proposal_link,
+        questionnaire_link = excluded.questionnaire_link,
+        contract_link = excluded.contract_link,
+        send_date = excluded.send_date,
+        update_date = excluded.update_date
+"""
+
+# Seconds a link check result stays fresh; older links are checked again on the next audit
+LINK_CHECK_TTL = 24 * 3600
+
+# Worker threads of a link audit, connections opened per host, and seconds before a check times out
+LINK_CHECK_WORKERS = 16
+LINK_CHECK_HOST_CONNECTIONS = 2
+LINK_CHECK_TIMEOUT = 10
+
+# Redirects followed per link before giving up
+LINK_CHECK_MAX_REDIRECTS = 5
+
+# Access-restricted pages exist (e-signature and form tools answer them), so they are not reported as broken
+LINK_ALIVE_STATUSES = (401, 403)
+
+LINK_CHECK_UPSERT_SQL = """
+    INSERT INTO link_checks (url, ok, status_code, error, elapsed_ms, checked_at) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (url) DO UPDATE SET
+        ok = excluded.ok,
+        status_code = excluded.status_code,
+        error = excluded.error,
+        elapsed_ms = excluded.elapsed_ms,
+        checked_at = excluded.checked_at
+"""
+
+# Closed proposals (Accepted/Rejected) not updated for this many days are moved
+# to the archive database; config.json can override it with "archive_after_days"
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_STATUSES = (3, 4)
+
+# Proposals moved to the archive per transaction
+ARCHIVE_BATCH_SIZE = 5000
+
+# The archive of "x.db" is "x_archive.db", attached to every connection as schema "archive"
+ARCHIVE_SUFFIX = "_archive.db"
+
+# Columns shared by live and archived proposals
+PROPOSAL_COLUMNS = ["proposal_id", "client_id", "project_name", "project_description", "proposal_value", "status",
+                    "proposal_link", "questionnaire_link", "contract_link", "send_date", "update_date"]
+
+ARCHIVE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS archive.archived_proposals (
+        proposal_id INTEGER PRIMARY KEY,
+        client_id INTEGER,
+        project_name TEXT NOT NULL,
+        project_description TEXT,
+        proposal_value REAL,
+        status INTEGER,
+        proposal_link TEXT,
+        questionnaire_link TEXT,
+        contract_link TEXT,
+        send_date TEXT,
+        update_date TEXT,
+        archived_at TEXT NOT NULL
+    )
+"""
+
+# Online backups copy this many database pages per step, releasing the read
+# lock in between; a step that finds the database locked is retried after
+# BACKUP_BUSY_SLEEP seconds
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_BUSY_SLEEP = 0.05
+
+# A write from another connection restarts a stepped backup; after this many
+# restarts the copy is finished in one step instead, which in WAL mode reads
+# a consistent snapshot without blocking the writers
+BACKUP_MAX_RESTARTS = 3
+
+# Default folder of the backup files
+BACKUP_DIR = "backups"
+
+# Problems listed at most by a verification
+BACKUP_MAX_ERRORS = 100
+
+# JSON field names of client rows, proposal search rows and proposal page rows
+CLIENT_FIELDS = ["client_id", "full_name", "email", "phone"]
+PROPOSAL_SEARCH_FIELDS = ["proposal_id", "client_name", "project_name", "proposal_value"]
+PROPOSAL_PAGE_FIELDS = ["proposal_id", "client_name", "project_name", "proposal_value", "status",
+                        "update_date", "proposal_link", "questionnaire_link", "contract_link"]
+
+# Local HTTP API: bind address, worker threads, and largest page a request may ask for
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_WORKERS = 8
+API_MAX_PAGE_SIZE = 200
+
+# Seconds an idle keep-alive connection may hold an API worker
+API_IDLE_TIMEOUT = 5
+
+# Word pools and status mix (Sent, Negotiation, Accepted, Rejected) of synthetic benchmark databases
+SYNTHETIC_FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Elena", "Felipe", "Grace", "Hugo", "Iris", "Jonas",
+                         "Karen", "Lucas", "Marta", "Nadia", "Oscar", "Paula", "Rafael", "Sofia", "Tomas", "Vera"]
+SYNTHETIC_LAST_NAMES = ["Silva", "Smith", "Costa", "Miller", "Santos", "Brown", "Oliveira", "Garcia", "Souza", "Lopez",
+                        "Pereira", "Wilson", "Almeida", "Moore", "Ferreira", "Taylor", "Rocha", "Clark", "Lima", "Young"]
+SYNTHETIC_PROJECT_WORDS = ["website", "redesign", "mobile", "app", "landing", "page", "brand", "identity", "shop",
+                           "dashboard", "api", "integration", "blog", "migration", "audit", "seo", "campaign", "portal"]
+SYNTHETIC_STATUS_WEIGHTS = [40, 20, 25, 15]
+
+# Sample standard reply rendered by the template benchmark
+BENCHMARK_TEMPLATE = (
+    "Hello [client_name],\n\nFollowing up on the proposal for [project_name] ([proposal_value]), "
+    "currently marked as [status]. You can review it at [proposal_link] and fill in the questionnaire "
+    "at [questionnaire_link].\n\nBest regards"
+)
+
+# SQLite tuning applied to every connection opened by the script: WAL lets
+# readers (reports, exports) run alongside a writer, and NORMAL sync only
+# fsyncs at checkpoints instead of on every commit.
+DB_PRAGMAS = [
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -20000),       # negative = KiB, about 20 MB of page cache
+    ("mmap_size", 268435456),     # 256 MB of memory-mapped I/O
+    ("temp_store", "MEMORY"),
+]
+
+# Seconds a connection waits on a locked database before giving up
+DB_BUSY_TIMEOUT = 10.0
+
+# Environment variable that turns profiling on: "1", or the path of a JSON file written at exit
+PROFILE_ENV_VAR = "PROPPILOT_PROFILE"
+
+# Upper bounds (ms) of the latency histogram buckets; a last bucket takes everything slower
+PROFILE_BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+# Statements whose query plan is captured, by first keyword
+PROFILE_PLANNED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+# Statements listed on the diagnostics screen, slowest (total time) first
+DIAGNOSTICS_TOP = 15
+
+# --- Instrumentation ---
+
+class Profiler:
+    """Aggregates the timings of SQL statements and named operations (SMTP steps) into histograms.
+
+    Statements are grouped by their text with whitespace collapsed, so one
+    query run with different parameters is one entry. A statement's histogram
+    holds its time to first row (the execute call); `total_ms` and `rows` also
+    include fetching. The query plan is captured on the first execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.statements = {}
+        self.timers = {}
+
+    @staticmethod
+    def _new_entry():
+        return {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "histogram": [0] * (len(PROFILE_BUCKETS_MS) + 1)}
+
+    @staticmethod
+    def _add(entry, elapsed_ms):
+        import bisect
+        entry["calls"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["histogram"][bisect.bisect_left(PROFILE_BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_statement(self, conn, sql, parameters, elapsed_ms, rows):
+        """Records one execute call and returns the statement's entry, to which fetches are added."""
+        key = " ".join(sql.split())
+        with self._lock:
+            entry = self.statements.get(key)
+            is_new = entry is None
+            if is_new:
+                entry = self.statements[key] = dict(self._new_entry(), rows=0, plan=None)
+            self._add(entry, elapsed_ms)
+            entry["rows"] += max(rows, 0)
+        if is_new and parameters is not None and key.split(" ", 1)[0].upper() in PROFILE_PLANNED_STATEMENTS:
+            try:
+                # The base class method runs the statement without going through the profiler again
+                plan = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+                entry["plan"] = [row[3] for row in plan]
+            except sqlite3.Error:
+                pass
+        return entry
+
+    def record_fetch(self, entry, elapsed_ms, rows):
+        with self._lock:
+            entry["total_ms"] += elapsed_ms
+            entry["rows"] += rows
+
+    def record_timing(self, name, elapsed_ms):
+        with self._lock:
+            self._add(self.timers.setdefault(name, self._new_entry()), elapsed_ms)
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.timers.clear()
+            self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    @staticmethod
+    def _summary(entry):
+        calls = entry["calls"]
+        labels = [f"<={bound}ms" for bound in PROFILE_BUCKETS_MS] + [f">{PROFILE_BUCKETS_MS[-1]}ms"]
+        seen = 0
+        p95 = None
+        for label, count in zip(labels, entry["histogram"]):
+            seen += count
+            if p95 is None and calls and seen >= 0.95 * calls:
+                p95 = label
+        return {
+            "calls": calls,
+            "total_ms": round(entry["total_ms"], 3),
+            "mean_ms": round(entry["total_ms"] / calls, 3) if calls else 0,
+            "max_ms": round(entry["max_ms"], 3),
+            "p95": p95,
+            "histogram": {label: count for label, count in zip(labels, entry["histogram"]) if count},
+        }
+
+    def snapshot(self):
+        """Returns everything recorded so far as JSON-serializable data, slowest statements first."""
+        with self._lock:
+            statements = []
+            for sql, entry in self.statements.items():
+                summary = self._summary(entry)
+                plan = entry["plan"] or []
+                summary.update(
+                    sql=sql,
+                    rows=entry["rows"],
+                    plan=plan,
+                    full_scan=any(step.startswith("SCAN ") and "VIRTUAL TABLE" not in step for step in plan),
+                )
+                statements.append(summary)
+            timers = {name: self._summary(entry) for name, entry in sorted(self.timers.items())}
+        statements.sort(key=lambda summary: summary["total_ms"], reverse=True)
+        return {"started_at": self.started_at, "statements": statements, "timers": timers}
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor reporting each statement's timing, rows and query plan to its connection's profiler."""
+
+    _profile_entry = None
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._profile_entry = self.connection.profiler.record_statement(
+            self.connection, sql, parameters, (time.perf_counter() - started) * 1000, self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._profile_entry = self.connection.profiler.record_statement(
+            self.connection, sql, None, (time.perf_counter() - started) * 1000, self.rowcount)
+        return self
+
+    def _record_fetch(self, started, rows):
+        if self._profile_entry is not None:
+            self.connection.profiler.record_fetch(self._profile_entry, (time.perf_counter() - started) * 1000, rows)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._record_fetch(started, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._record_fetch(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._record_fetch(started, len(rows))
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        row = super().__next__()
+        self._record_fetch(started, 1)
+        return row
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors, including those of the execute shortcuts, are profiled."""
+
+    profiler = None
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+_profiler = None
+
+def enable_profiling(dump_path=None):
+    """Turns profiling on for connections opened from now on; with `dump_path`, writes the results there at exit."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    if dump_path:
+        atexit.register(dump_profile, dump_path)
+    return _profiler
+
+def record_timing(name, started):
+    """Records the time elapsed since `started` (a perf_counter value) under `name`, when profiling is on."""
+    if _profiler is not None:
+        _profiler.record_timing(name, (time.perf_counter() - started) * 1000)
+
+def dump_profile(path):
+    """Writes the profiler's results to a JSON file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(_profiler.snapshot(), f, indent=2)
+
+# --- Connection Manager ---
+
+def open_connection(db_path=DB_PATH, read_only=False, check_same_thread=True):
+    """Opens a tuned SQLite connection, profiled when profiling is on. Read-only connections never take the write lock."""
+    factory = sqlite3.Connection if _profiler is None else ProfilingConnection
+    if read_only:
+        from urllib.parse import quote
+        uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=DB_BUSY_TIMEOUT, check_same_thread=check_same_thread,
+                               factory=factory)
+    else:
+        conn = sqlite3.connect(db_path, timeout=DB_BUSY_TIMEOUT, check_same_thread=check_same_thread, factory=factory)
+    if _profiler is not None:
+        conn.profiler = _profiler
+    for name, value in DB_PRAGMAS:
+        if read_only and name == "journal_mode":
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+    # The archive only exists once something was archived; connections opened
+    # before that pick it up later through attach_existing_archive
+    if db_path != ":memory:" and os.path.exists(archive_path(db_path)):
+        attach_archive(conn, archive_path(db_path), read_only)
+    else:
+        create_all_proposals_view(conn)
+    return conn
+
+@contextmanager
+def transaction(conn):
+    """Runs the enclosed statements as one write transaction, committing on success and rolling back on error.
+
+    BEGIN IMMEDIATE takes the write lock up front, so a concurrent writer waits
+    on the busy timeout instead of failing halfway with "database is locked".
+    Nested use joins the transaction that is already open.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+@contextmanager
+def read_only_connection(db_path=DB_PATH):
+    """Yields a separate read-only connection, for long reads that must not block the writer."""
+    conn = open_connection(db_path, read_only=True)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def database_file(conn):
+    """Returns the file of the connection's main database, or "" for an in-memory one."""
+    return conn.execute("SELECT file FROM pragma_database_list WHERE name = 'main'").fetchone()[0]
+
+@contextmanager
+def snapshot_connection(conn):
+    """Yields a read-only connection to the database of `conn`, for a long report or export.
+
+    Falls back to `conn` itself for in-memory databases and inside a
+    transaction, whose uncommitted writes only `conn` can see.
+    """
+    db_file = database_file(conn)
+    if not db_file or conn.in_transaction:
+        yield conn
+        return
+    with read_only_connection(db_file) as reader:
+        yield reader
+
+def close_db(conn):
+    """Lets SQLite refresh its planner statistics and closes the connection."""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+# --- Read Caches ---
+
+class LRUCache:
+    """A thread-safe, bounded least-recently-used cache whose entries expire `ttl` seconds after they are stored."""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups * 100 if lookups else 0}
+
+# Client rows (client_id, full_name, email, phone) by client_id
+_client_cache = LRUCache(CLIENT_CACHE_SIZE, READ_CACHE_TTL)
+# Compiled (subject, content) of the standard replies by reply_id
+_reply_cache = LRUCache(TEMPLATE_CACHE_SIZE, READ_CACHE_TTL)
+# The parsed config.json, under a single key
+_config_cache = LRUCache(1, READ_CACHE_TTL)
+
+READ_CACHES = {"clients": _client_cache, "standard_replies": _reply_cache, "config": _config_cache}
+
+def clear_read_caches():
+    """Empties every read cache, e.g. after the database was replaced by a restore."""
+    for cache in READ_CACHES.values():
+        cache.clear()
+
+def get_client(cursor, client_id):
+    """Returns the (client_id, full_name, email, phone) row of a client, or None if it does not exist.
+
+    Rows read inside a write transaction are not cached, since the
+    transaction may still roll back.
+    """
+    client = _client_cache.get(client_id)
+    if client is None:
+        cursor.execute("SELECT client_id, full_name, email, phone FROM clients WHERE client_id = ?", (client_id,))
+        client = cursor.fetchone()
+        if client is not None and not cursor.connection.in_transaction:
+            _client_cache.put(client_id, client)
+    return client
+
+def invalidate_client(client_id):
+    """Drops a client from the cache after it was edited."""
+    _client_cache.invalidate(client_id)
+
 # --- Database and Script Logic Functions ---
 
-def connect_db():
-    """Connects to the database and creates the tables if they do not exist."""
-    conn = sqlite3.connect('proposal_pilot.db')
+def get_schema_version(cursor):
+    """Returns the schema version recorded in the database file."""
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+def apply_migrations(conn):
+    """Applies every pending schema migration, each one in its own transaction."""
+    cursor = conn.cursor()
+    current_version = get_schema_version(cursor)
+    for version, statements in enumerate(SCHEMA_MIGRATIONS, start=1):
+        if version <= current_version:
+            continue
+        with transaction(conn):
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(f"PRAGMA user_version = {version}")
+    return max(current_version, len(SCHEMA_MIGRATIONS))
+
+def connect_db(db_path=DB_PATH):
+    """Connects to the database, creates the tables if they do not exist and applies pending migrations."""
+    conn = open_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -94,6 +1018,7 @@ def connect_db():
     """)
 
     conn.commit()
+    apply_migrations(conn)
     return conn, cursor
 
 def is_valid_url(url):
@@ -102,17 +1027,51 @@ def is_valid_url(url):
         return True
     return re.match(URL_PATTERN, url) is not None
 
+@functools.lru_cache(maxsize=URL_HOST_CACHE_SIZE)
+def is_valid_url_host(host):
+    """Checks an ASCII host against the host part of URL_PATTERN."""
+    return URL_HOST_REGEX.fullmatch(host) is not None
+
+def validate_url(url):
+    """Gives the same answer as is_valid_url, with one cheap regex pass and a memoized host check.
+
+    In URL_PATTERN the host always spans the whole run of host characters
+    after the scheme, since none of the characters allowed to follow it can
+    be part of a host; so when URL_FAST_PATTERN matches, only its host is left
+    to check. URLs it rejects (invalid ones, or ones relying on Unicode case
+    folding or Unicode digits) get the full pattern.
+    """
+    if not url:
+        return True
+    match = URL_FAST_PATTERN.match(url)
+    if match is None:
+        return URL_PATTERN.match(url) is not None
+    return is_valid_url_host(match.group(1))
+
+def validate_urls(urls):
+    """Validates an iterable of URLs like is_valid_url. Returns a list of booleans in input order.
+
+    Hosts are memoized across calls; whole links are not, since hashing a
+    mostly unique link costs about as much as validating it on the fast path.
+    """
+    return list(map(validate_url, urls))
+
 def read_config():
-    """Reads configurations from a JSON file."""
-    if os.path.exists('config.json'):
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    return {}
+    """Reads configurations from a JSON file, parsing it again only when the cached copy expired."""
+    config = _config_cache.get('config.json')
+    if config is None:
+        config = {}
+        if os.path.exists('config.json'):
+            with open('config.json', 'r') as f:
+                config = json.load(f)
+        _config_cache.put('config.json', config)
+    return dict(config)
 
 def save_config(config):
     """Saves configurations to a JSON file."""
     with open('config.json', 'w') as f:
         json.dump(config, f, indent=4)
+    _config_cache.put('config.json', dict(config))
 
 def configure_email():
     """Guides the user to configure email credentials."""
@@ -135,29 +1094,266 @@ def configure_email():
     save_config(config)
     print(GREEN + "✅ Email configuration saved successfully!" + RESET_ALL)
 
-def send_email(recipient, subject, body):
-    """Sends an email using the saved configurations."""
-    config = read_config()
-    if not config:
-        print(GREEN + "❌ Error: Email configurations not found. Please configure them first." + RESET_ALL)
-        return False
-    
-    try:
-        msg = MIMEText(body)
-        msg['Subject'] = subject
-        msg['From'] = config['sender_email']
-        msg['To'] = recipient
+# --- Email Delivery ---
 
-        with smtplib.SMTP(config['smtp_server'], config['smtp_port']) as server:
-            server.starttls()
-            server.login(config['sender_email'], config['email_password'])
-            server.send_message(msg)
-        
-        print(GREEN + f"✅ Email sent successfully to {recipient}!" + RESET_ALL)
-        return True
-    except Exception as e:
-        print(GREEN + f"❌ Error sending email: {e}" + RESET_ALL)
-        return False
+class SMTPSessionPool:
+    """Keeps authenticated SMTP sessions open and reuses them across sends.
+
+    At most `max_sessions` sessions exist at once; extra senders wait for a
+    free one. A session dropped by the server is replaced transparently.
+    """
+
+    def __init__(self, config, max_sessions=SMTP_MAX_SESSIONS):
+        self.config = config
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Opens a new session: connect, STARTTLS (unless disabled in the config) and login."""
+        import smtplib
+        started = time.perf_counter()
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=SMTP_TIMEOUT)
+        record_timing("smtp.connect", started)
+        try:
+            if self.config.get('smtp_starttls', True):
+                started = time.perf_counter()
+                server.starttls()
+                record_timing("smtp.starttls", started)
+            if self.config.get('email_password'):
+                started = time.perf_counter()
+                server.login(self.config['sender_email'], self.config['email_password'])
+                record_timing("smtp.login", started)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def _checkout(self):
+        """Takes an idle session, checking stale ones with NOOP, or opens a new one."""
+        import smtplib
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            if time.monotonic() - last_used < SMTP_IDLE_CHECK:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(server)
+        return self._connect()
+
+    def _checkin(self, server):
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+
+    def _discard(self, server):
+        import smtplib
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _send_message(self, server, msg):
+        started = time.perf_counter()
+        server.send_message(msg)
+        record_timing("smtp.send", started)
+
+    def send(self, msg):
+        """Sends a message on a pooled session, reconnecting once if the server closed it."""
+        import smtplib
+        started = time.perf_counter()
+        with self._slots:
+            record_timing("smtp.wait_for_session", started)
+            server = self._checkout()
+            try:
+                try:
+                    self._send_message(server, msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._discard(server)
+                    server = None
+                    server = self._connect()
+                    self._send_message(server, msg)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # The server rejected this message, but the session is still usable
+                if server is not None:
+                    self._checkin(server)
+                raise
+            except BaseException:
+                if server is not None:
+                    self._discard(server)
+                raise
+            self._checkin(server)
+
+    def close(self):
+        """Closes every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._discard(server)
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+def get_smtp_pool(config):
+    """Returns the shared SMTP session pool, replacing it if the email configuration changed."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None or _smtp_pool.config != config:
+            if _smtp_pool is not None:
+                _smtp_pool.close()
+            _smtp_pool = SMTPSessionPool(config)
+        return _smtp_pool
+
+def close_smtp_pool():
+    """Logs out of every pooled SMTP session."""
+    with _smtp_pool_lock:
+        if _smtp_pool is not None:
+            _smtp_pool.close()
+
+atexit.register(close_smtp_pool)
+
+def deliver_email(config, recipient, subject, body):
+    """Builds and sends a message through the session pool; errors are raised to the caller."""
+    from email.mime.text import MIMEText
+    msg = MIMEText(body)
+    msg['Subject'] = subject
+    msg['From'] = config['sender_email']
+    msg['To'] = recipient
+    get_smtp_pool(config).send(msg)
+
+class RateLimiter:
+    """Spaces calls evenly so that no more than `rate` happen per second across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+def insert_client(cursor, full_name, email, phone):
+    """Inserts a client and returns its ID. Raises sqlite3.IntegrityError if the email is already registered."""
+    registration_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute("INSERT INTO clients (full_name, email, phone, registration_date) VALUES (?, ?, ?, ?)",
+                   (full_name, email, phone, registration_date))
+    return cursor.lastrowid
+
+def insert_proposal(cursor, client_id, project_name, description, value,
+                    proposal_link="", questionnaire_link="", contract_link=""):
+    """Inserts a proposal with status 'Sent' and returns its ID. Raises ValueError on an unknown client or invalid link."""
+    if get_client(cursor, client_id) is None:
+        raise ValueError("Client not found. Please register the client first.")
+    for link in (proposal_link, questionnaire_link, contract_link):
+        if not is_valid_url(link):
+            raise ValueError(f"Invalid link: {link}")
+
+    send_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    status = 1
+    cursor.execute("""
+        INSERT INTO proposals (client_id, project_name, project_description, proposal_value, status, proposal_link, questionnaire_link, contract_link, send_date, update_date) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                   (client_id, project_name, description, value, status, proposal_link, questionnaire_link, contract_link, send_date, send_date))
+    return cursor.lastrowid
+
+def set_proposal_status(cursor, proposal_ids, status):
+    """Sets the status of the given proposals and returns how many were updated."""
+    if status not in STATUS_LABELS:
+        raise ValueError("Invalid status option.")
+    update_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute("UPDATE proposals SET status = ?, update_date = ? WHERE proposal_id IN (SELECT value FROM json_each(?))",
+                   (status, update_date, json.dumps(list(proposal_ids))))
+    return cursor.rowcount
+
+def proposal_filter(proposal_ids=None, status=None, client_id=None, older_than_days=None):
+    """Builds the WHERE clause and parameters selecting proposals by ID list and/or filters.
+
+    `older_than_days` selects proposals not updated for that many days.
+    Raises ValueError when nothing narrows the selection.
+    """
+    conditions = []
+    params = []
+    if proposal_ids is not None:
+        conditions.append("proposal_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(proposal_id) for proposal_id in proposal_ids]))
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if client_id is not None:
+        conditions.append("client_id = ?")
+        params.append(client_id)
+    if older_than_days is not None:
+        conditions.append("update_date < ?")
+        params.append((datetime.now() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S'))
+    if not conditions:
+        raise ValueError("A bulk update needs a list of proposal IDs or at least one filter.")
+    return " AND ".join(conditions), params
+
+def validate_proposal_changes(changes):
+    """Checks and normalizes a {column: new value} dict for a bulk update. Raises ValueError."""
+    if not changes:
+        raise ValueError("Nothing to change.")
+    normalized = {}
+    for column, value in changes.items():
+        if column not in BULK_EDITABLE_COLUMNS:
+            raise ValueError(f"'{column}' cannot be bulk updated.")
+        if column == "status":
+            value = int(value)
+            if value not in STATUS_LABELS:
+                raise ValueError("Invalid status option.")
+        elif column == "proposal_value":
+            value = float(value)
+        elif column == "project_name" and not value:
+            raise ValueError("The project name cannot be empty.")
+        elif column.endswith("_link") and not validate_url(value):
+            raise ValueError(f"Invalid link: {value}")
+        normalized[column] = value
+    return normalized
+
+def count_matching_proposals(cursor, changes, **filters):
+    """Returns (proposals selected by the filters, how many of them a bulk update with `changes` would modify)."""
+    where, params = proposal_filter(**filters)
+    changes = validate_proposal_changes(changes)
+    unchanged = " AND ".join(f"{column} IS ?" for column in changes)
+    cursor.execute(f"SELECT COUNT(*), TOTAL(NOT ({unchanged})) FROM proposals WHERE {where}",
+                   list(changes.values()) + params)
+    matched, to_update = cursor.fetchone()
+    return matched, int(to_update)
+
+def bulk_update_proposals(cursor, changes, **filters):
+    """Applies {column: new value} changes to every selected proposal with one set-based UPDATE.
+
+    Takes the filters of proposal_filter. Proposals that already hold the
+    new values are left alone; a status change also stamps update_date.
+    Runs inside the caller's transaction. Returns the number of proposals updated.
+    """
+    where, params = proposal_filter(**filters)
+    changes = validate_proposal_changes(changes)
+    assignments = dict(changes)
+    if "status" in changes:
+        assignments["update_date"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    unchanged = " AND ".join(f"{column} IS ?" for column in changes)
+    cursor.execute(f"""
+        UPDATE proposals SET {", ".join(f"{column} = ?" for column in assignments)}
+        WHERE {where} AND NOT ({unchanged})
+    """, list(assignments.values()) + params + list(changes.values()))
+    return cursor.rowcount
+
+def parse_id_list(text):
+    """Parses IDs separated by commas and/or spaces. Raises ValueError."""
+    return [int(part) for part in text.replace(",", " ").split()]
 
 def add_client(conn, cursor):
     """Prompts for client data and adds it to the database."""
@@ -165,11 +1361,9 @@ def add_client(conn, cursor):
     full_name = input(GREEN + "Full name: " + RESET_ALL)
     email = input(GREEN + "Email: " + RESET_ALL)
     phone = input(GREEN + "Phone: " + RESET_ALL)
-    registration_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     try:
-        cursor.execute("INSERT INTO clients (full_name, email, phone, registration_date) VALUES (?, ?, ?, ?)",
-                       (full_name, email, phone, registration_date))
-        conn.commit()
+        with transaction(conn):
+            insert_client(cursor, full_name, email, phone)
         print(GREEN + f"✅ Client '{full_name}' registered successfully!" + RESET_ALL)
     except sqlite3.IntegrityError:
         print(GREEN + "❌ Error: This email is already registered." + RESET_ALL)
@@ -179,8 +1373,7 @@ def add_proposal(conn, cursor):
     print(GREEN + "\n--- Register New Proposal ---")
     try:
         client_id = int(input(GREEN + "Client ID: " + RESET_ALL))
-        cursor.execute("SELECT client_id FROM clients WHERE client_id = ?", (client_id,))
-        if not cursor.fetchone():
+        if get_client(cursor, client_id) is None:
             print(GREEN + "❌ Error: Client not found. Please register the client first." + RESET_ALL)
             return
 
@@ -203,81 +1396,216 @@ def add_proposal(conn, cursor):
             if is_valid_url(contract_link): break
             print(GREEN + "❌ Invalid link. Please enter a full URL (e.g., https://...)" + RESET_ALL)
         
-        send_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        status = 1 
-        
-        cursor.execute("""
-            INSERT INTO proposals (client_id, project_name, project_description, proposal_value, status, proposal_link, questionnaire_link, contract_link, send_date, update_date) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                       (client_id, project_name, description, value, status, proposal_link, questionnaire_link, contract_link, send_date, send_date))
-        conn.commit()
+        with transaction(conn):
+            insert_proposal(cursor, client_id, project_name, description, value, proposal_link, questionnaire_link, contract_link)
         print(GREEN + f"✅ Proposal for project '{project_name}' registered successfully!" + RESET_ALL)
     except ValueError:
         print(GREEN + "❌ Error: Client ID and proposal value must be numbers." + RESET_ALL)
 
-def view_proposals(cursor):
-    """Displays all proposals in a table format, with links."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print(GREEN + "--- All Proposals ---" + RESET_ALL)
-    cursor.execute("""
+def fetch_proposal_page(cursor, after=None, before=None, status=None, client_id=None, page_size=PROPOSAL_PAGE_SIZE):
+    """Fetches one screen of proposals, most recently updated first.
+
+    Uses keyset pagination on (update_date, proposal_id): `after` continues
+    towards older rows past the given key, `before` goes back towards newer
+    ones. Only `page_size` rows are read, whatever the size of the table.
+    """
+    conditions = []
+    params = []
+    if status is not None:
+        conditions.append("p.status = ?")
+        params.append(status)
+    if client_id is not None:
+        conditions.append("p.client_id = ?")
+        params.append(client_id)
+
+    order = "DESC"
+    if after is not None:
+        conditions.append("(p.update_date, p.proposal_id) < (?, ?)")
+        params.extend(after)
+    elif before is not None:
+        conditions.append("(p.update_date, p.proposal_id) > (?, ?)")
+        params.extend(before)
+        order = "ASC"
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor.execute(f"""
         SELECT p.proposal_id, c.full_name, p.project_name, p.proposal_value, p.status, p.update_date, p.proposal_link, p.questionnaire_link, p.contract_link
         FROM proposals p
         JOIN clients c ON p.client_id = c.client_id
-        ORDER BY p.update_date DESC
-    """)
-    proposals = cursor.fetchall()
-    
-    if not proposals:
-        print(GREEN + "No proposals found." + RESET_ALL)
-        return
+        {where}
+        ORDER BY p.update_date {order}, p.proposal_id {order}
+        LIMIT ?
+    """, params + [page_size])
+    rows = cursor.fetchall()
+    if before is not None:
+        rows.reverse()
+    return rows
 
-    headers = ["ID", "Client", "Project", "Value", "Status", "Update", "Links"]
-    status_map = {1: "Sent", 2: "Negotiation", 3: "Accepted", 4: "Rejected"}
+def page_key(row):
+    """Returns the keyset pagination key (update_date, proposal_id) of a proposal row."""
+    return (row[5], row[0])
+
+def format_proposal_rows(proposals, broken=frozenset()):
+    """Converts proposal rows into table rows for display; links in `broken` are marked with '!'."""
     table_data = []
     for prop in proposals:
         links_info = []
-        if prop[6]: links_info.append("P")
-        if prop[7]: links_info.append("Q")
-        if prop[8]: links_info.append("C")
-        
-        prop_list = [
+        for letter, link in zip("PQC", prop[6:9]):
+            if link:
+                links_info.append(letter + "!" if link in broken else letter)
+
+        table_data.append([
             prop[0],
             prop[1],
             prop[2],
             f"$ {prop[3]:.2f}",
-            status_map.get(prop[4], "Unknown"),
+            STATUS_LABELS.get(prop[4], "Unknown"),
             prop[5],
             ", ".join(links_info)
-        ]
-        table_data.append(prop_list)
+        ])
+    return table_data
 
-    print(GREEN + tabulate(table_data, headers=headers, tablefmt="grid") + RESET_ALL)
-    print(GREEN + "\nLink Legend: P=Proposal, Q=Questionnaire, C=Contract" + RESET_ALL)
-    input(GREEN + "\nPress Enter to return to the menu..." + RESET_ALL)
+def view_proposals(cursor):
+    """Browses proposals one screen at a time, with links, navigation and filters."""
+    headers = ["ID", "Client", "Project", "Value", "Status", "Update", "Links"]
+    status = None
+    client_id = None
+    page = fetch_proposal_page(cursor)
+    message = ""
+
+    while True:
+        clear_screen()
+        print(GREEN + "--- All Proposals ---" + RESET_ALL)
+        filters = []
+        if status is not None:
+            filters.append(f"status = {STATUS_LABELS[status]}")
+        if client_id is not None:
+            filters.append(f"client ID = {client_id}")
+        if filters:
+            print(GREEN + "Filters: " + ", ".join(filters) + RESET_ALL)
+
+        if page:
+            broken = broken_links(cursor, {link for row in page for link in row[6:9] if link})
+            print(GREEN + tabulate(format_proposal_rows(page, broken), headers=headers, tablefmt="grid") + RESET_ALL)
+            print(GREEN + "\nLink Legend: P=Proposal, Q=Questionnaire, C=Contract, !=broken at the last link check" + RESET_ALL)
+        else:
+            print(GREEN + "No proposals found." + RESET_ALL)
+        if message:
+            print(GREEN + message + RESET_ALL)
+            message = ""
+
+        print(GREEN + "\n[N] Next  [P] Previous  [J] Jump to date  [F] Filter  [R] Restart  [0] Back" + RESET_ALL)
+        option = input(GREEN + "Choose an option: " + RESET_ALL).strip().upper()
+
+        if option == 'N':
+            rows = fetch_proposal_page(cursor, after=page_key(page[-1]), status=status, client_id=client_id) if page else []
+            if rows:
+                page = rows
+            else:
+                message = "ℹ️ This is the last page."
+        elif option == 'P':
+            rows = fetch_proposal_page(cursor, before=page_key(page[0]), status=status, client_id=client_id) if page else []
+            if rows:
+                page = rows
+            else:
+                message = "ℹ️ This is the first page."
+        elif option == 'J':
+            date_text = input(GREEN + "Show proposals updated on or before (YYYY-MM-DD): " + RESET_ALL).strip()
+            try:
+                datetime.strptime(date_text, '%Y-%m-%d')
+            except ValueError:
+                message = "❌ Invalid date. Use the format YYYY-MM-DD."
+                continue
+            # The largest possible key for that day: every proposal updated up to its last second
+            page = fetch_proposal_page(cursor, after=(f"{date_text} 23:59:59", sys.maxsize), status=status, client_id=client_id)
+        elif option == 'F':
+            try:
+                status_text = input(GREEN + "Status (1-4, blank for all): " + RESET_ALL).strip()
+                client_text = input(GREEN + "Client ID (blank for all): " + RESET_ALL).strip()
+                new_status = int(status_text) if status_text else None
+                new_client_id = int(client_text) if client_text else None
+            except ValueError:
+                message = "❌ Error: Status and client ID must be numbers."
+                continue
+            if new_status is not None and new_status not in STATUS_LABELS:
+                message = "❌ Error: Invalid status option."
+                continue
+            status, client_id = new_status, new_client_id
+            page = fetch_proposal_page(cursor, status=status, client_id=client_id)
+        elif option == 'R':
+            page = fetch_proposal_page(cursor, status=status, client_id=client_id)
+        elif option == '0':
+            break
+        else:
+            message = "❌ Invalid option."
+
+def build_fts_query(term):
+    """Turns free text into an FTS5 query where every word is matched as a prefix."""
+    words = re.findall(r'\w+', term)
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_records(cursor, term, limit=SEARCH_RESULT_LIMIT):
+    """Searches the full-text indexes and returns (clients, proposals), best matches first."""
+    query = build_fts_query(term)
+    if not query:
+        return [], []
+
+    cursor.execute("""
+        SELECT c.client_id, c.full_name, c.email, c.phone
+        FROM clients_fts
+        JOIN clients c ON c.client_id = clients_fts.rowid
+        WHERE clients_fts MATCH ?
+        ORDER BY clients_fts.rank
+        LIMIT ?
+    """, (query, limit))
+    clients = cursor.fetchall()
+
+    # A proposal matches on its own text or on the name/email of its client;
+    # each side is cut to the best :limit rows before they are merged.
+    cursor.execute("""
+        WITH matches(proposal_id, score) AS (
+            SELECT * FROM (
+                SELECT rowid, rank
+                FROM proposals_fts
+                WHERE proposals_fts MATCH :query
+                ORDER BY rank
+                LIMIT :limit
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT p.proposal_id, clients_fts.rank
+                FROM clients_fts
+                JOIN proposals p ON p.client_id = clients_fts.rowid
+                WHERE clients_fts MATCH :query
+                ORDER BY clients_fts.rank
+                LIMIT :limit
+            )
+        )
+        SELECT p.proposal_id, c.full_name, p.project_name, p.proposal_value
+        FROM (SELECT proposal_id, MIN(score) AS score FROM matches GROUP BY proposal_id) m
+        JOIN proposals p ON p.proposal_id = m.proposal_id
+        JOIN clients c ON c.client_id = p.client_id
+        ORDER BY m.score
+        LIMIT :limit
+    """, {"query": query, "limit": limit})
+    proposals = cursor.fetchall()
+
+    return clients, proposals
 
 def search_data(cursor):
-    """Allows searching for clients or proposals by name."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Allows searching for clients or proposals by name, email or project text."""
+    clear_screen()
     print(GREEN + "--- Search Clients/Proposals ---" + RESET_ALL)
-    term = input(GREEN + "Enter search term (client or project name): " + RESET_ALL)
-    term = f"%{term}%"
+    term = input(GREEN + "Enter search term (client, email or project; word beginnings match): " + RESET_ALL)
+    clients, proposals = search_records(cursor, term)
 
     print(GREEN + "\nClient Results:" + RESET_ALL)
-    cursor.execute("SELECT client_id, full_name, email, phone FROM clients WHERE full_name LIKE ?", (term,))
-    clients = cursor.fetchall()
     if clients:
         print(GREEN + tabulate(clients, headers=["ID", "Name", "Email", "Phone"], tablefmt="grid") + RESET_ALL)
     else:
         print(GREEN + "No clients found." + RESET_ALL)
 
     print(GREEN + "\nProposal Results:" + RESET_ALL)
-    cursor.execute("""
-        SELECT p.proposal_id, c.full_name, p.project_name, p.proposal_value
-        FROM proposals p
-        JOIN clients c ON p.client_id = c.client_id
-        WHERE p.project_name LIKE ? OR c.full_name LIKE ?
-    """, (term, term))
-    proposals = cursor.fetchall()
     if proposals:
         print(GREEN + tabulate(proposals, headers=["ID", "Client", "Project", "Value"], tablefmt="grid") + RESET_ALL)
     else:
@@ -286,14 +1614,19 @@ def search_data(cursor):
     input(GREEN + "\nPress Enter to return to the menu..." + RESET_ALL)
 
 def update_proposal_status(conn, cursor):
-    """Allows updating the status of a proposal."""
+    """Allows updating the status of one or more proposals at once."""
     print(GREEN + "\n--- Update Proposal Status ---" + RESET_ALL)
     try:
-        proposal_id = int(input(GREEN + "ID of the proposal to be updated: " + RESET_ALL))
-        cursor.execute("SELECT status FROM proposals WHERE proposal_id = ?", (proposal_id,))
-        if not cursor.fetchone():
+        proposal_ids = parse_id_list(input(GREEN + "ID(s) of the proposals to be updated (comma-separated): " + RESET_ALL))
+        cursor.execute("SELECT proposal_id FROM proposals WHERE proposal_id IN (SELECT value FROM json_each(?))",
+                       (json.dumps(proposal_ids),))
+        found = {row[0] for row in cursor.fetchall()}
+        missing = [proposal_id for proposal_id in proposal_ids if proposal_id not in found]
+        if not found:
             print(GREEN + "❌ Error: Proposal not found." + RESET_ALL)
             return
+        if missing:
+            print(GREEN + f"ℹ️ Not found, skipped: {', '.join(map(str, missing))}" + RESET_ALL)
 
         print(GREEN + "\nChoose the new status:" + RESET_ALL)
         print(GREEN + "1 - Sent" + RESET_ALL)
@@ -302,53 +1635,257 @@ def update_proposal_status(conn, cursor):
         print(GREEN + "4 - Rejected" + RESET_ALL)
         new_status = int(input(GREEN + "New status (1-4): " + RESET_ALL))
 
-        if new_status not in [1, 2, 3, 4]:
+        if new_status not in STATUS_LABELS:
             print(GREEN + "❌ Error: Invalid status option." + RESET_ALL)
             return
         
-        update_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute("UPDATE proposals SET status = ?, update_date = ? WHERE proposal_id = ?",
-                       (new_status, update_date, proposal_id))
-        conn.commit()
-        print(GREEN + f"✅ Status of proposal {proposal_id} updated successfully!" + RESET_ALL)
+        with transaction(conn):
+            updated = set_proposal_status(cursor, sorted(found), new_status)
+        if len(found) == 1:
+            print(GREEN + f"✅ Status of proposal {min(found)} updated successfully!" + RESET_ALL)
+        else:
+            print(GREEN + f"✅ Status of {updated} proposals updated successfully!" + RESET_ALL)
     except ValueError:
         print(GREEN + "❌ Error: ID and status must be numbers." + RESET_ALL)
 
-def generate_report(cursor):
-    """Generates a performance report based on proposals."""
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print(GREEN + "--- Performance Report ---" + RESET_ALL)
-    
-    cursor.execute("SELECT COUNT(*) FROM proposals")
-    total_proposals = cursor.fetchone()[0]
+def get_data_version(cursor, name='proposals'):
+    """Returns (database file, version counter) for a table; the counter changes on every write to it."""
+    cursor.execute("""
+        SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'), version
+        FROM data_versions WHERE name = ?
+    """, (name,))
+    return cursor.fetchone()
+
+def compute_report_metrics(cursor):
+    """Computes every report metric in a single aggregate pass over the live and archived proposals."""
+    if is_archive_attached(cursor.connection):
+        # Each side is grouped on its own first: grouping the all_proposals
+        # view directly would lose the covering index on the live table
+        cursor.execute("""
+            SELECT status, SUM(proposal_count), TOTAL(total_value) FROM (
+                SELECT status, COUNT(*) AS proposal_count, TOTAL(proposal_value) AS total_value
+                FROM main.proposals GROUP BY status
+                UNION ALL
+                SELECT status, COUNT(*), TOTAL(proposal_value) FROM archive.archived_proposals GROUP BY status
+            )
+            GROUP BY status
+        """)
+    else:
+        cursor.execute("SELECT status, COUNT(*), TOTAL(proposal_value) FROM main.proposals GROUP BY status")
+    by_status = []
+    total_proposals = 0
+    total_value = 0.0
+    for status, count, value in cursor.fetchall():
+        by_status.append({
+            "status": status,
+            "label": STATUS_LABELS.get(status, "Unknown"),
+            "count": count,
+            "value": value,
+        })
+        total_proposals += count
+        total_value += value
 
-    cursor.execute("SELECT COUNT(*) FROM proposals WHERE status = 3")
-    accepted_proposals = cursor.fetchone()[0]
+    accepted = next((row for row in by_status if row["status"] == 3), {"count": 0, "value": 0.0})
+    accepted_proposals = accepted["count"]
+    total_accepted_value = accepted["value"]
+
+    return {
+        "total_proposals": total_proposals,
+        "total_value": total_value,
+        "accepted_proposals": accepted_proposals,
+        "acceptance_rate": (accepted_proposals / total_proposals * 100) if total_proposals > 0 else 0,
+        "total_accepted_value": total_accepted_value,
+        "average_accepted_value": (total_accepted_value / accepted_proposals) if accepted_proposals > 0 else 0,
+        "average_proposal_value": (total_value / total_proposals) if total_proposals > 0 else 0,
+        "by_status": by_status,
+    }
 
-    cursor.execute("SELECT SUM(proposal_value) FROM proposals WHERE status = 3")
-    total_accepted_value = cursor.fetchone()[0] or 0.0
+def get_report_metrics(cursor):
+    """Returns the report metrics, recomputing them only when the proposals changed since the last call."""
+    # Archiving changes the data version too, so a cached result never misses the archive
+    attach_existing_archive(cursor.connection)
+    key = get_data_version(cursor)
+    metrics = _report_cache.get(key)
+    if metrics is None:
+        metrics = compute_report_metrics(cursor)
+        _report_cache.clear()
+        _report_cache[key] = metrics
+    return metrics
 
-    acceptance_rate = (accepted_proposals / total_proposals * 100) if total_proposals > 0 else 0
-    average_value = (total_accepted_value / accepted_proposals) if accepted_proposals > 0 else 0
+def generate_report(cursor):
+    """Generates a performance report based on proposals."""
+    clear_screen()
+    print(GREEN + "--- Performance Report ---" + RESET_ALL)
 
+    metrics = get_report_metrics(cursor)
     report_data = [
-        ["Total Proposals", total_proposals],
-        ["Accepted Proposals", accepted_proposals],
-        ["Acceptance Rate", f"{acceptance_rate:.2f}%"],
-        ["Total Value of Accepted", f"$ {total_accepted_value:.2f}"],
-        ["Average Value per Project", f"$ {average_value:.2f}"]
+        ["Total Proposals", metrics["total_proposals"]],
+        ["Accepted Proposals", metrics["accepted_proposals"]],
+        ["Acceptance Rate", f"{metrics['acceptance_rate']:.2f}%"],
+        ["Total Value of Accepted", f"$ {metrics['total_accepted_value']:.2f}"],
+        ["Average Value per Project", f"$ {metrics['average_accepted_value']:.2f}"],
+        ["Average Proposal Value", f"$ {metrics['average_proposal_value']:.2f}"]
     ]
-    
     print(GREEN + tabulate(report_data, headers=["Metric", "Value"], tablefmt="grid") + RESET_ALL)
+
+    status_data = [[row["label"], row["count"], f"$ {row['value']:.2f}"] for row in metrics["by_status"]]
+    if status_data:
+        print(GREEN + "\nPipeline by Status:" + RESET_ALL)
+        print(GREEN + tabulate(status_data, headers=["Status", "Proposals", "Value"], tablefmt="grid") + RESET_ALL)
     input(GREEN + "\nPress Enter to return to the menu..." + RESET_ALL)
 
-def edit_client(conn, cursor):
-    """Edits data of an existing client."""
-    print(GREEN + "\n--- Edit Client ---" + RESET_ALL)
+def compute_trend_report(cursor, period_type='month', periods=TREND_PERIODS):
+    """Reads the latest monthly or weekly trends from the rollup tables, oldest period first."""
+    cursor.execute("""
+        SELECT period,
+               SUM(proposal_count),
+               SUM(CASE WHEN status = 1 THEN proposal_count ELSE 0 END),
+               SUM(CASE WHEN status = 2 THEN proposal_count ELSE 0 END),
+               SUM(CASE WHEN status = 3 THEN proposal_count ELSE 0 END),
+               SUM(CASE WHEN status = 4 THEN proposal_count ELSE 0 END),
+               SUM(CASE WHEN status = 3 THEN total_value ELSE 0 END),
+               SUM(CASE WHEN status IN (1, 2) THEN total_value ELSE 0 END)
+        FROM proposal_rollups
+        WHERE period_type = ? AND period != 'undated'
+        GROUP BY period
+        ORDER BY period DESC
+        LIMIT ?
+    """, (period_type, periods))
+    trends = []
+    for period, total, sent, negotiation, accepted, rejected, revenue, pipeline in reversed(cursor.fetchall()):
+        closed = accepted + rejected
+        trends.append({
+            "period": period,
+            "total_proposals": total,
+            "sent": sent,
+            "negotiation": negotiation,
+            "accepted": accepted,
+            "rejected": rejected,
+            "win_rate": (accepted / closed * 100) if closed > 0 else 0,
+            "revenue": revenue,
+            "open_pipeline": pipeline,
+        })
+    return trends
+
+def compute_velocity_report(cursor):
+    """Computes time per stage and the conversion funnel from the status history in one windowed query.
+
+    For each status: how many proposals ever reached it, how many left it
+    (and how many are in it now), and the median and mean days spent in it
+    before moving on. Conversion is the share of sent proposals that reached it.
+    """
+    cursor.execute("""
+        WITH stays AS (
+            SELECT proposal_id, new_status AS status,
+                   julianday(LEAD(changed_at) OVER (PARTITION BY proposal_id ORDER BY changed_at, history_id))
+                   - julianday(changed_at) AS days
+            FROM proposal_status_history
+        ),
+        ranked AS (
+            SELECT status, proposal_id, days,
+                   ROW_NUMBER() OVER by_days AS position,
+                   COUNT(days) OVER by_days AS exited
+            FROM stays
+            WINDOW by_days AS (PARTITION BY status ORDER BY days IS NULL, days
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+        )
+        SELECT status,
+               COUNT(DISTINCT proposal_id),
+               MAX(exited),
+               COUNT(*) - MAX(exited),
+               AVG(CASE WHEN position IN ((exited + 1) / 2, (exited + 2) / 2) THEN days END),
+               AVG(days)
+        FROM ranked
+        GROUP BY status
+        ORDER BY status
+    """)
+    rows = cursor.fetchall()
+    sent = next((row[1] for row in rows if row[0] == 1), 0)
+    return [{
+        "status": status,
+        "label": STATUS_LABELS.get(status, "Unknown"),
+        "proposals": reached,
+        "conversion": round(reached / sent * 100, 2) if sent else 0,
+        "exited": exited,
+        "in_stage": in_stage,
+        "median_days": round(median_days, 2) if median_days is not None else None,
+        "mean_days": round(mean_days, 2) if mean_days is not None else None,
+    } for status, reached, exited, in_stage, median_days, mean_days in rows]
+
+def generate_velocity_report(cursor):
+    """Shows how long proposals stay in each stage and how many make it through the funnel."""
+    print(GREEN + "\n--- Pipeline Velocity ---" + RESET_ALL)
+    velocity = compute_velocity_report(cursor)
+    if not velocity:
+        print(GREEN + "No proposals found." + RESET_ALL)
+        return
+
+    def days(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    headers = ["Stage", "Reached", "Conversion", "Moved On", "In Stage Now", "Median Days", "Mean Days"]
+    table_data = [[
+        row["label"], row["proposals"], f"{row['conversion']:.2f}%", row["exited"], row["in_stage"],
+        days(row["median_days"]), days(row["mean_days"])
+    ] for row in velocity]
+    print(GREEN + tabulate(table_data, headers=headers, tablefmt="grid") + RESET_ALL)
+    print(GREEN + "\nDays are measured over the stays that ended; conversion is relative to proposals sent." + RESET_ALL)
+
+def generate_trend_report(cursor):
+    """Shows monthly or weekly revenue, win rate and pipeline trends."""
+    print(GREEN + "\n--- Trend Report ---" + RESET_ALL)
+    print(GREEN + "[1] Monthly" + RESET_ALL)
+    print(GREEN + "[2] Weekly" + RESET_ALL)
+    choice = input(GREEN + "Choose an option (1 or 2): " + RESET_ALL)
+    if choice not in ['1', '2']:
+        print(GREEN + "❌ Invalid option." + RESET_ALL)
+        return
+    period_type = 'month' if choice == '1' else 'week'
+
+    trends = compute_trend_report(cursor, period_type)
+    if not trends:
+        print(GREEN + "No proposals found." + RESET_ALL)
+        return
+
+    headers = ["Period", "Total", "Sent", "Negotiation", "Accepted", "Rejected", "Win Rate", "Revenue", "Open Pipeline"]
+    table_data = [[
+        row["period"], row["total_proposals"], row["sent"], row["negotiation"], row["accepted"], row["rejected"],
+        f"{row['win_rate']:.2f}%", f"$ {row['revenue']:.2f}", f"$ {row['open_pipeline']:.2f}"
+    ] for row in trends]
+    print(GREEN + tabulate(table_data, headers=headers, tablefmt="grid") + RESET_ALL)
+    print(GREEN + "\nProposals are grouped by the period in which they were sent." + RESET_ALL)
+
+def reports_menu(cursor):
+    """Sub-menu for the performance and trend reports, each read on its own read-only connection."""
+    while True:
+        clear_screen()
+        print(GREEN + "--- Reports Menu ---" + RESET_ALL)
+        print(GREEN + "[1] Performance report" + RESET_ALL)
+        print(GREEN + "[2] Monthly/weekly trends" + RESET_ALL)
+        print(GREEN + "[3] Pipeline velocity" + RESET_ALL)
+        print(GREEN + "[0] Back" + RESET_ALL)
+
+        option = input(GREEN + "\nChoose an option: " + RESET_ALL)
+
+        reports = {'1': generate_report, '2': generate_trend_report, '3': generate_velocity_report}
+        if option in reports:
+            with snapshot_connection(cursor.connection) as reader:
+                reports[option](reader.cursor())
+            if option == '1':
+                continue
+        elif option == '0':
+            break
+        else:
+            print(GREEN + "❌ Invalid option." + RESET_ALL)
+
+        input(GREEN + "\nPress Enter to continue..." + RESET_ALL)
+
+def edit_client(conn, cursor):
+    """Edits data of an existing client."""
+    print(GREEN + "\n--- Edit Client ---" + RESET_ALL)
     try:
         client_id = int(input(GREEN + "ID of the client to be edited: " + RESET_ALL))
-        cursor.execute("SELECT * FROM clients WHERE client_id = ?", (client_id,))
-        client = cursor.fetchone()
+        client = get_client(cursor, client_id)
         if not client:
             print(GREEN + "❌ Error: Client not found." + RESET_ALL)
             return
@@ -361,19 +1898,21 @@ def edit_client(conn, cursor):
         field_choice = input(GREEN + "Choose an option: " + RESET_ALL)
 
         if field_choice == '1':
+            column = "full_name"
             new_value = input(GREEN + "New full name: " + RESET_ALL)
-            cursor.execute("UPDATE clients SET full_name = ? WHERE client_id = ?", (new_value, client_id))
         elif field_choice == '2':
+            column = "email"
             new_value = input(GREEN + "New email: " + RESET_ALL)
-            cursor.execute("UPDATE clients SET email = ? WHERE client_id = ?", (new_value, client_id))
         elif field_choice == '3':
+            column = "phone"
             new_value = input(GREEN + "New phone: " + RESET_ALL)
-            cursor.execute("UPDATE clients SET phone = ? WHERE client_id = ?", (new_value, client_id))
         else:
             print(GREEN + "❌ Invalid option." + RESET_ALL)
             return
 
-        conn.commit()
+        with transaction(conn):
+            cursor.execute(f"UPDATE clients SET {column} = ? WHERE client_id = ?", (new_value, client_id))
+        invalidate_client(client_id)
         print(GREEN + "✅ Client updated successfully!" + RESET_ALL)
     except ValueError:
         print(GREEN + "❌ Error: Client ID must be a number." + RESET_ALL)
@@ -401,48 +1940,96 @@ def edit_proposal(conn, cursor):
 
         new_value = ""
         if field_choice == '1':
+            column = "project_name"
             new_value = input(GREEN + "New project name: " + RESET_ALL)
-            cursor.execute("UPDATE proposals SET project_name = ? WHERE proposal_id = ?", (new_value, proposal_id))
         elif field_choice == '2':
+            column = "project_description"
             new_value = input(GREEN + "New description: " + RESET_ALL)
-            cursor.execute("UPDATE proposals SET project_description = ? WHERE proposal_id = ?", (new_value, proposal_id))
         elif field_choice == '3':
+            column = "proposal_value"
             new_value = float(input(GREEN + "New value: " + RESET_ALL))
-            cursor.execute("UPDATE proposals SET proposal_value = ? WHERE proposal_id = ?", (new_value, proposal_id))
         elif field_choice == '4':
+            column = "proposal_link"
             while True:
                 new_value = input(GREEN + "New proposal link: " + RESET_ALL)
                 if is_valid_url(new_value): break
                 print(GREEN + "❌ Invalid link. Please enter a full URL." + RESET_ALL)
-            cursor.execute("UPDATE proposals SET proposal_link = ? WHERE proposal_id = ?", (new_value, proposal_id))
         elif field_choice == '5':
+            column = "questionnaire_link"
             while True:
                 new_value = input(GREEN + "New questionnaire link: " + RESET_ALL)
                 if is_valid_url(new_value): break
                 print(GREEN + "❌ Invalid link. Please enter a full URL." + RESET_ALL)
-            cursor.execute("UPDATE proposals SET questionnaire_link = ? WHERE proposal_id = ?", (new_value, proposal_id))
         elif field_choice == '6':
+            column = "contract_link"
             while True:
                 new_value = input(GREEN + "New contract link: " + RESET_ALL)
                 if is_valid_url(new_value): break
                 print(GREEN + "❌ Invalid link. Please enter a full URL." + RESET_ALL)
-            cursor.execute("UPDATE proposals SET contract_link = ? WHERE proposal_id = ?", (new_value, proposal_id))
         else:
             print(GREEN + "❌ Invalid option." + RESET_ALL)
             return
 
-        conn.commit()
+        with transaction(conn):
+            cursor.execute(f"UPDATE proposals SET {column} = ? WHERE proposal_id = ?", (new_value, proposal_id))
         print(GREEN + "✅ Proposal updated successfully!" + RESET_ALL)
     except ValueError:
         print(GREEN + "❌ Error: Proposal ID and value must be numbers." + RESET_ALL)
 
+def bulk_update_menu(conn, cursor):
+    """Changes one field of many proposals, chosen by ID list or by filter, in a single transaction."""
+    print(GREEN + "\n--- Bulk Update Proposals ---" + RESET_ALL)
+    try:
+        filters = {}
+        ids_text = input(GREEN + "Proposal IDs (comma-separated, blank to select by filter): " + RESET_ALL).strip()
+        if ids_text:
+            filters["proposal_ids"] = parse_id_list(ids_text)
+        else:
+            status_text = input(GREEN + "Current status (1-4, blank for any): " + RESET_ALL).strip()
+            client_text = input(GREEN + "Client ID (blank for any): " + RESET_ALL).strip()
+            days_text = input(GREEN + "Not updated for at least N days (blank for any): " + RESET_ALL).strip()
+            if status_text:
+                filters["status"] = int(status_text)
+            if client_text:
+                filters["client_id"] = int(client_text)
+            if days_text:
+                filters["older_than_days"] = int(days_text)
+
+        columns = list(BULK_EDITABLE_COLUMNS)
+        print(GREEN + "\nWhich field do you want to change?" + RESET_ALL)
+        for number, column in enumerate(columns, start=1):
+            print(GREEN + f"[{number}] {BULK_EDITABLE_COLUMNS[column]}" + RESET_ALL)
+        choice = int(input(GREEN + "Choose an option: " + RESET_ALL))
+        if not 1 <= choice <= len(columns):
+            print(GREEN + "❌ Invalid option." + RESET_ALL)
+            return
+        column = columns[choice - 1]
+        if column == "status":
+            print(GREEN + "1 - Sent, 2 - Negotiation, 3 - Accepted, 4 - Rejected" + RESET_ALL)
+        changes = {column: input(GREEN + f"New {BULK_EDITABLE_COLUMNS[column].lower()}: " + RESET_ALL)}
+
+        matched, to_update = count_matching_proposals(cursor, changes, **filters)
+        if not to_update:
+            print(GREEN + f"ℹ️ {matched} proposals match, none of them needs changing." + RESET_ALL)
+            return
+        confirm = input(GREEN + f"{matched} proposals match, {to_update} will be updated. Continue? (y/N): " + RESET_ALL)
+        if confirm.strip().lower() != 'y':
+            print(GREEN + "ℹ️ Bulk update cancelled." + RESET_ALL)
+            return
+        with transaction(conn):
+            updated = bulk_update_proposals(cursor, changes, **filters)
+        print(GREEN + f"✅ {updated} proposals updated successfully!" + RESET_ALL)
+    except ValueError as e:
+        print(GREEN + f"❌ Error: {e}" + RESET_ALL)
+
 def edit_menu(conn, cursor):
     """Sub-menu for data editing."""
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
         print(GREEN + "--- Edit Menu ---" + RESET_ALL)
         print(GREEN + "[1] Edit Client" + RESET_ALL)
         print(GREEN + "[2] Edit Proposal" + RESET_ALL)
+        print(GREEN + "[3] Bulk Update Proposals" + RESET_ALL)
         print(GREEN + "[0] Back" + RESET_ALL)
         
         option = input(GREEN + "\nChoose an option: " + RESET_ALL)
@@ -451,6 +2038,8 @@ def edit_menu(conn, cursor):
             edit_client(conn, cursor)
         elif option == '2':
             edit_proposal(conn, cursor)
+        elif option == '3':
+            bulk_update_menu(conn, cursor)
         elif option == '0':
             break
         else:
@@ -466,7 +2055,2516 @@ def add_standard_reply(conn, cursor):
     content = input(GREEN + "Full reply content: " + RESET_ALL)
     
     try:
-        cursor.execute("INSERT INTO standard_replies (type, subject, content) VALUES (?, ?, ?)",
-                       (type_reply, subject, content))
-        conn.commit()
-        print(GREEN + f"✅ Standard reply '{type_reply}' 
\ No newline at end of file
+        with transaction(conn):
+            cursor.execute("INSERT INTO standard_replies (type, subject, content) VALUES (?, ?, ?)",
+                           (type_reply, subject, content))
+        print(GREEN + f"✅ Standard reply '{type_reply}' added successfully!" + RESET_ALL)
+    except sqlite3.Error as e:
+        print(GREEN + f"❌ Error adding standard reply: {e}" + RESET_ALL)
+
+def view_standard_replies(cursor):
+    """Displays all saved standard reply templates."""
+    print(GREEN + "\n--- Standard Replies ---" + RESET_ALL)
+    cursor.execute("SELECT reply_id, type, subject FROM standard_replies ORDER BY reply_id")
+    replies = cursor.fetchall()
+    if replies:
+        print(GREEN + tabulate(replies, headers=["ID", "Type", "Subject"], tablefmt="grid") + RESET_ALL)
+    else:
+        print(GREEN + "No standard replies found." + RESET_ALL)
+
+def edit_standard_reply(conn, cursor):
+    """Edits the type, subject or content of a standard reply."""
+    print(GREEN + "\n--- Edit Standard Reply ---" + RESET_ALL)
+    try:
+        reply_id = int(input(GREEN + "ID of the reply to be edited: " + RESET_ALL))
+    except ValueError:
+        print(GREEN + "❌ Error: Reply ID must be a number." + RESET_ALL)
+        return
+    cursor.execute("SELECT type FROM standard_replies WHERE reply_id = ?", (reply_id,))
+    reply = cursor.fetchone()
+    if not reply:
+        print(GREEN + "❌ Error: Standard reply not found." + RESET_ALL)
+        return
+
+    print(GREEN + f"\nSelected reply: {reply[0]}" + RESET_ALL)
+    print(GREEN + "Which field do you want to edit?" + RESET_ALL)
+    print(GREEN + "[1] Type" + RESET_ALL)
+    print(GREEN + "[2] Subject" + RESET_ALL)
+    print(GREEN + "[3] Content" + RESET_ALL)
+    field_choice = input(GREEN + "Choose an option: " + RESET_ALL)
+    columns = {'1': "type", '2': "subject", '3': "content"}
+    if field_choice not in columns:
+        print(GREEN + "❌ Invalid option." + RESET_ALL)
+        return
+    new_value = input(GREEN + "New value: " + RESET_ALL)
+
+    with transaction(conn):
+        cursor.execute(f"UPDATE standard_replies SET {columns[field_choice]} = ? WHERE reply_id = ?", (new_value, reply_id))
+    invalidate_compiled_reply(reply_id)
+    print(GREEN + "✅ Standard reply updated successfully!" + RESET_ALL)
+
+# --- Email Templates ---
+
+class TemplateValues(dict):
+    """Placeholder values for rendering; unknown placeholders are left in the text as they were."""
+
+    def __missing__(self, name):
+        return f"[{name}]"
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text):
+    """Parses a template once into a str.format_map pattern, so rendering is a single C-level pass."""
+    pattern = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        pattern.append(text[position:match.start()].replace("{", "{{").replace("}", "}}"))
+        name = match.group(1)
+        pattern.append("{" + PLACEHOLDER_ALIASES.get(name, name) + "}")
+        position = match.end()
+    pattern.append(text[position:].replace("{", "{{").replace("}", "}}"))
+    return "".join(pattern)
+
+def render_template(compiled, values):
+    """Renders a compiled template with a TemplateValues mapping."""
+    return compiled.format_map(values)
+
+def get_compiled_reply(cursor, reply_id):
+    """Returns the compiled (subject, content) of a standard reply, or None if it does not exist."""
+    compiled = _reply_cache.get(reply_id)
+    if compiled is not None:
+        return compiled
+
+    cursor.execute("SELECT subject, content FROM standard_replies WHERE reply_id = ?", (reply_id,))
+    template = cursor.fetchone()
+    if not template:
+        return None
+    compiled = (compile_template(template[0] or ""), compile_template(template[1] or ""))
+    _reply_cache.put(reply_id, compiled)
+    return compiled
+
+def invalidate_compiled_reply(reply_id):
+    """Drops a standard reply from the compiled cache after it was edited."""
+    _reply_cache.invalidate(reply_id)
+
+def template_values(client, proposal=None):
+    """Builds the placeholder values from a client row (name, email, phone) and an optional proposal row.
+
+    The proposal row is (project_name, project_description, proposal_value, status,
+    proposal_link, questionnaire_link, contract_link).
+    """
+    values = TemplateValues(
+        client_name=client[0] or "",
+        client_email=client[1] or "",
+        client_phone=client[2] or "",
+    )
+    if proposal is not None:
+        values.update(
+            project_name=proposal[0] or "",
+            project_description=proposal[1] or "",
+            proposal_value=f"{proposal[2] or 0:.2f}",
+            status=STATUS_LABELS.get(proposal[3], "Unknown"),
+            proposal_link=proposal[4] or "",
+            questionnaire_link=proposal[5] or "",
+            contract_link=proposal[6] or "",
+        )
+    return values
+
+def send_email_with_template(conn, cursor):
+    """Prepares and sends an email from a template to a client, optionally about one of their proposals."""
+    print(GREEN + "\n--- Send Email with Template ---" + RESET_ALL)
+    try:
+        reply_id = int(input(GREEN + "Reply template ID: " + RESET_ALL))
+        client_id = int(input(GREEN + "ID of the client to send to: " + RESET_ALL))
+        proposal_text = input(GREEN + "Proposal ID for [project_name] etc. (optional): " + RESET_ALL).strip()
+        proposal_id = int(proposal_text) if proposal_text else None
+
+        compiled = get_compiled_reply(cursor, reply_id)
+        client = get_client(cursor, client_id)
+
+        if not compiled or not client:
+            print(GREEN + "❌ Error: Template or Client not found." + RESET_ALL)
+            return
+
+        proposal = None
+        if proposal_id is not None:
+            cursor.execute("""
+                SELECT project_name, project_description, proposal_value, status, proposal_link, questionnaire_link, contract_link
+                FROM proposals WHERE proposal_id = ? AND client_id = ?
+            """, (proposal_id, client_id))
+            proposal = cursor.fetchone()
+            if not proposal:
+                print(GREEN + "❌ Error: Proposal not found for this client." + RESET_ALL)
+                return
+
+        if not read_config():
+            print(GREEN + "❌ Error: Email configurations not found. Please configure them first." + RESET_ALL)
+            return
+
+        values = template_values(client[1:], proposal)
+        subject = render_template(compiled[0], values)
+        body = render_template(compiled[1], values)
+        email = client[2]
+        
+        if enqueue_email(conn, email, subject, body, make_idempotency_key(email, subject, body)):
+            print(GREEN + f"✅ Email to {email} queued; it will be sent in the background." + RESET_ALL)
+        else:
+            print(GREEN + f"ℹ️ This email was already queued for {email} today." + RESET_ALL)
+    except ValueError:
+        print(GREEN + "❌ Error: Template, client and proposal IDs must be numbers." + RESET_ALL)
+
+# --- Email Outbox ---
+
+def make_idempotency_key(recipient, subject, body):
+    """Builds the outbox key under which the same message to the same recipient is queued once per day."""
+    digest = hashlib.sha1(f"{recipient}\n{subject}\n{body}".encode('utf-8')).hexdigest()
+    return f"{datetime.now().strftime('%Y-%m-%d')}:{digest}"
+
+def enqueue_email(conn, recipient, subject, body, idempotency_key=None):
+    """Queues an email for background delivery. Returns False if the key was already queued."""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with transaction(conn):
+        cursor = conn.execute("""
+            INSERT INTO email_outbox (idempotency_key, recipient, subject, body, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (idempotency_key) DO NOTHING
+        """, (idempotency_key, recipient, subject, body, now, now))
+    if _outbox_worker is not None:
+        _outbox_worker.notify()
+    return cursor.rowcount == 1
+
+def new_outbox_owner():
+    """Returns a unique name under which a worker claims outbox messages."""
+    import uuid
+    return f"{os.getpid()}-{uuid.uuid4().hex}"
+
+def claim_outbox_batch(conn, owner, limit=OUTBOX_BATCH_SIZE):
+    """Atomically marks the next due messages as 'sending' by `owner` and returns them.
+
+    Messages another worker left 'sending' are only taken over once their
+    claim is older than OUTBOX_CLAIM_TIMEOUT.
+    """
+    now = datetime.now()
+    expired = datetime.fromtimestamp(now.timestamp() - OUTBOX_CLAIM_TIMEOUT).strftime('%Y-%m-%d %H:%M:%S')
+    now = now.strftime('%Y-%m-%d %H:%M:%S')
+    with transaction(conn):
+        cursor = conn.execute("""
+            UPDATE email_outbox SET status = 'sending', claimed_by = ?, claimed_at = ?
+            WHERE message_id IN (
+                SELECT message_id FROM email_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'sending' AND (claimed_at IS NULL OR claimed_at <= ?))
+                ORDER BY next_attempt_at
+                LIMIT ?
+            )
+            RETURNING message_id, recipient, subject, body, attempts
+        """, (owner, now, now, expired, limit))
+        return cursor.fetchall()
+
+def is_permanent_smtp_error(error):
+    """Tells whether retrying cannot help: refused recipients or any 5xx reply from the server."""
+    import smtplib
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+def deliver_outbox_batch(conn, config, limit=OUTBOX_BATCH_SIZE, owner=None):
+    """Sends one batch of due outbox messages and records the outcome. Returns the number processed.
+
+    Outcomes are only written for messages still claimed by `owner`, so a
+    claim that expired and was taken over is not overwritten.
+    """
+    owner = owner or new_outbox_owner()
+    batch = claim_outbox_batch(conn, owner, limit)
+    results = []
+    for message_id, recipient, subject, body, attempts in batch:
+        try:
+            deliver_email(config, recipient, subject, body)
+            results.append((message_id, attempts, None, False))
+        except Exception as e:
+            results.append((message_id, attempts, e, is_permanent_smtp_error(e)))
+
+    now = datetime.now()
+    with transaction(conn):
+        for message_id, attempts, error, permanent in results:
+            if error is None:
+                conn.execute("""UPDATE email_outbox SET status = 'sent', attempts = ?, last_error = NULL, sent_at = ?, claimed_by = NULL, claimed_at = NULL
+                                WHERE message_id = ? AND claimed_by = ?""",
+                             (attempts + 1, now.strftime('%Y-%m-%d %H:%M:%S'), message_id, owner))
+            elif permanent or attempts + 1 >= OUTBOX_MAX_ATTEMPTS:
+                conn.execute("""UPDATE email_outbox SET status = 'failed', attempts = ?, last_error = ?, claimed_by = NULL, claimed_at = NULL
+                                WHERE message_id = ? AND claimed_by = ?""",
+                             (attempts + 1, str(error), message_id, owner))
+            else:
+                delay = min(OUTBOX_RETRY_DELAY * 2 ** attempts, OUTBOX_MAX_RETRY_DELAY)
+                next_attempt = datetime.fromtimestamp(now.timestamp() + delay).strftime('%Y-%m-%d %H:%M:%S')
+                conn.execute("""UPDATE email_outbox SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ?, claimed_by = NULL, claimed_at = NULL
+                                WHERE message_id = ? AND claimed_by = ?""",
+                             (attempts + 1, str(error), next_attempt, message_id, owner))
+    return len(batch)
+
+class OutboxWorker(threading.Thread):
+    """Background thread that drains the email outbox in batches, on its own connection."""
+
+    def __init__(self, db_path=DB_PATH, poll_interval=OUTBOX_POLL_INTERVAL):
+        super().__init__(name="outbox-worker", daemon=True)
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.owner = new_outbox_owner()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def run(self):
+        conn = open_connection(self.db_path)
+        try:
+            # Messages left 'sending' by an interrupted run are retried once
+            # their claim expires (see claim_outbox_batch)
+            while not self._stopping.is_set():
+                config = read_config()
+                processed = 0
+                if config:
+                    try:
+                        processed = deliver_outbox_batch(conn, config, owner=self.owner)
+                    except sqlite3.Error:
+                        processed = 0
+                if not processed:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+        finally:
+            conn.close()
+
+    def notify(self):
+        """Wakes the worker up because new messages were queued."""
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Asks the worker to finish its current batch and waits for it."""
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+_outbox_worker = None
+
+def start_outbox_worker(db_path=DB_PATH):
+    """Starts the background delivery worker if it is not running yet."""
+    global _outbox_worker
+    if _outbox_worker is None or not _outbox_worker.is_alive():
+        _outbox_worker = OutboxWorker(db_path)
+        _outbox_worker.start()
+    return _outbox_worker
+
+def stop_outbox_worker(timeout=10):
+    """Stops the background delivery worker; undelivered messages stay queued for the next run."""
+    global _outbox_worker
+    if _outbox_worker is not None:
+        _outbox_worker.stop(timeout)
+        _outbox_worker = None
+
+def view_outbox(cursor):
+    """Shows how many queued emails are in each delivery state, and the latest failures."""
+    print(GREEN + "\n--- Email Outbox ---" + RESET_ALL)
+    cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status ORDER BY status")
+    counts = cursor.fetchall()
+    if not counts:
+        print(GREEN + "The outbox is empty." + RESET_ALL)
+        return
+    print(GREEN + tabulate(counts, headers=["Status", "Messages"], tablefmt="grid") + RESET_ALL)
+
+    cursor.execute("""
+        SELECT message_id, recipient, attempts, last_error FROM email_outbox
+        WHERE status = 'failed' OR (status = 'pending' AND attempts > 0)
+        ORDER BY message_id DESC LIMIT 10
+    """)
+    problems = cursor.fetchall()
+    if problems:
+        print(GREEN + "\nLatest delivery problems:" + RESET_ALL)
+        print(GREEN + tabulate(problems, headers=["ID", "Recipient", "Attempts", "Last Error"], tablefmt="grid") + RESET_ALL)
+
+def select_campaign_recipients(cursor, status, per_proposal=False):
+    """Returns the placeholder values of the recipients of a campaign to proposals in the given status.
+
+    Each client with an email gets one message, filled in from their latest
+    proposal in that status, unless `per_proposal` asks for one per proposal.
+    """
+    latest_only = "" if per_proposal else \
+        "AND p.proposal_id IN (SELECT MAX(proposal_id) FROM proposals WHERE status = :status GROUP BY client_id)"
+    cursor.execute(f"""
+        SELECT c.full_name, c.email, c.phone,
+               p.project_name, p.project_description, p.proposal_value, p.status,
+               p.proposal_link, p.questionnaire_link, p.contract_link
+        FROM proposals p
+        JOIN clients c ON c.client_id = p.client_id
+        WHERE p.status = :status AND c.email IS NOT NULL AND c.email != '' {latest_only}
+        ORDER BY p.proposal_id
+    """, {"status": status})
+    return [template_values(row[:3], row[3:]) for row in cursor.fetchall()]
+
+def send_with_retry(config, recipient, subject, body, limiter, attempts=CAMPAIGN_MAX_ATTEMPTS):
+    """Sends one email, retrying transient failures with exponential backoff. Returns the error or None.
+
+    Permanent errors (see is_permanent_smtp_error) are returned at once.
+    """
+    delay = CAMPAIGN_RETRY_DELAY
+    for attempt in range(1, attempts + 1):
+        limiter.wait()
+        try:
+            deliver_email(config, recipient, subject, body)
+            return None
+        except Exception as e:
+            if attempt == attempts or is_permanent_smtp_error(e):
+                return e
+        time.sleep(delay)
+        delay *= 2
+
+def run_campaign(config, template, recipients, workers=CAMPAIGN_WORKERS, rate=CAMPAIGN_RATE_LIMIT, progress=None):
+    """Renders a (subject, content) template per recipient and sends it from a bounded thread pool.
+
+    `recipients` are TemplateValues mappings such as those returned by
+    select_campaign_recipients. Returns a summary with the number sent,
+    the failures and the throughput.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    limiter = RateLimiter(rate)
+    summary = {"sent": 0, "failed": 0, "failures": []}
+    started = time.perf_counter()
+    subject_template = compile_template(template[0] or "")
+    body_template = compile_template(template[1] or "")
+
+    def send(recipient):
+        subject = render_template(subject_template, recipient)
+        body = render_template(body_template, recipient)
+        return recipient, send_with_retry(config, recipient["client_email"], subject, body, limiter)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(send, recipient) for recipient in recipients]
+        for future in as_completed(futures):
+            recipient, error = future.result()
+            if error is None:
+                summary["sent"] += 1
+            else:
+                summary["failed"] += 1
+                summary["failures"].append((recipient["client_email"], str(error)))
+            if progress:
+                progress(summary["sent"] + summary["failed"], time.perf_counter() - started)
+
+    summary["seconds"] = time.perf_counter() - started
+    summary["rate"] = summary["sent"] / summary["seconds"] if summary["seconds"] > 0 else 0
+    return summary
+
+def send_campaign(conn, cursor):
+    """Sends a template to every client with a proposal in a given status."""
+    print(GREEN + "\n--- Send Email Campaign ---" + RESET_ALL)
+    config = read_config()
+    if not config:
+        print(GREEN + "❌ Error: Email configurations not found. Please configure them first." + RESET_ALL)
+        return
+    try:
+        reply_id = int(input(GREEN + "Reply template ID: " + RESET_ALL))
+        status = int(input(GREEN + "Send to proposals in status (1-Sent, 2-Negotiation, 3-Accepted, 4-Rejected): " + RESET_ALL))
+    except ValueError:
+        print(GREEN + "❌ Error: Template ID and status must be numbers." + RESET_ALL)
+        return
+
+    cursor.execute("SELECT subject, content FROM standard_replies WHERE reply_id = ?", (reply_id,))
+    template = cursor.fetchone()
+    if not template:
+        print(GREEN + "❌ Error: Template not found." + RESET_ALL)
+        return
+    if status not in STATUS_LABELS:
+        print(GREEN + "❌ Error: Invalid status option." + RESET_ALL)
+        return
+
+    per_proposal = input(GREEN + "Send one email per proposal instead of one per client? (y/N): " + RESET_ALL).strip().lower() == 'y'
+    recipients = select_campaign_recipients(cursor, status, per_proposal)
+    if not recipients:
+        print(GREEN + "No recipients found." + RESET_ALL)
+        return
+    confirm = input(GREEN + f"Send {len(recipients):,} emails? (y/N): " + RESET_ALL)
+    if confirm.strip().lower() != 'y':
+        print(GREEN + "Campaign cancelled." + RESET_ALL)
+        return
+
+    def print_progress(done, elapsed):
+        rate = done / elapsed if elapsed > 0 else 0
+        print(GREEN + f"\r⏳ {done:,}/{len(recipients):,} processed ({rate:,.1f} emails/s)" + RESET_ALL, end="", flush=True)
+
+    summary = run_campaign(config, template, recipients, progress=print_progress)
+    print()
+    print(GREEN + f"✅ {summary['sent']:,} emails sent in {summary['seconds']:.1f}s ({summary['rate']:,.1f} emails/s)." + RESET_ALL)
+    if summary["failures"]:
+        print(GREEN + f"❌ {summary['failed']:,} emails failed:" + RESET_ALL)
+        print(GREEN + tabulate(summary["failures"][:20], headers=["Recipient", "Error"], tablefmt="grid") + RESET_ALL)
+
+def write_csv_stream(cursor, filename, compress=False, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Writes the rows of the cursor's current query to a CSV file, one fetchmany chunk at a time.
+
+    Memory use stays constant whatever the number of rows. `progress`, if
+    given, is called after each chunk with (rows written, seconds elapsed).
+    Returns the number of rows written.
+    """
+    import csv
+    import gzip
+    headers = [desc[0] for desc in cursor.description]
+    rows_written = 0
+    started = time.perf_counter()
+    if compress:
+        # Level 6 compresses nearly as well as the default 9 at a fraction of the CPU cost
+        stream = gzip.open(filename, 'wt', compresslevel=6, newline='', encoding='utf-8')
+    else:
+        stream = open(filename, 'w', newline='', encoding='utf-8')
+    with stream as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            writer.writerows(chunk)
+            rows_written += len(chunk)
+            if progress:
+                progress(rows_written, time.perf_counter() - started)
+    return rows_written
+
+def export_source(cursor, source, filename=None, columns=None, compress=False, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Streams one of the EXPORT_SOURCES data sets to CSV, optionally gzipped and limited to some columns.
+
+    Returns (file name, rows written).
+    """
+    default_filename, from_clause, available = EXPORT_SOURCES[source]
+    if columns:
+        expressions = dict(available)
+        unknown = [name for name in columns if name not in expressions]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for '{source}': {', '.join(unknown)}")
+        selected = [(name, expressions[name]) for name in columns]
+    else:
+        selected = available
+
+    filename = filename or default_filename
+    if compress and not filename.endswith('.gz'):
+        filename += '.gz'
+
+    select_list = ", ".join(f"{expression} AS {name}" for name, expression in selected)
+    cursor.execute(f"SELECT {select_list} FROM {from_clause}")
+    return filename, write_csv_stream(cursor, filename, compress, chunk_size, progress)
+
+def export_delta(conn, table, filename=None, compress=False, progress=None):
+    """Exports only the rows of `table` inserted or edited since its previous delta export.
+
+    New rows are those above the last exported id; edited rows come from the
+    change log. The marks only move forward once the file is fully written,
+    so a failed run is simply repeated by the next one. Returns (file name, rows written).
+    """
+    key = EXPORT_SOURCES[table][2][0][0]
+    cursor = conn.cursor()
+    cursor.execute("SELECT last_row_id, last_change_id FROM export_marks WHERE table_name = ?", (table,))
+    last_row_id, last_change_id = cursor.fetchone() or (0, 0)
+
+    # The new marks are taken before the export query, so anything written
+    # meanwhile is picked up again next time instead of being missed
+    cursor.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {table}")
+    max_row_id = cursor.fetchone()[0]
+    cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM change_log WHERE table_name = ?", (table,))
+    max_change_id = cursor.fetchone()[0]
+
+    if filename is None:
+        filename = f"{table}_delta_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    if compress and not filename.endswith('.gz'):
+        filename += '.gz'
+
+    select_list = ", ".join(name for name, _ in EXPORT_SOURCES[table][2])
+    with snapshot_connection(conn) as reader:
+        reader_cursor = reader.cursor()
+        reader_cursor.execute(f"""
+            SELECT {select_list} FROM {table}
+            WHERE ({key} > :last_row_id AND {key} <= :max_row_id)
+               OR {key} IN (
+                   SELECT row_id FROM change_log
+                   WHERE table_name = :table AND change_id > :last_change_id AND change_id <= :max_change_id
+               )
+            ORDER BY {key}
+        """, {"table": table, "last_row_id": last_row_id, "max_row_id": max_row_id,
+              "last_change_id": last_change_id, "max_change_id": max_change_id})
+        rows_written = write_csv_stream(reader_cursor, filename, compress, progress=progress)
+
+    with transaction(conn):
+        cursor.execute("""
+            INSERT INTO export_marks (table_name, last_row_id, last_change_id, exported_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (table_name) DO UPDATE SET
+                last_row_id = excluded.last_row_id,
+                last_change_id = excluded.last_change_id,
+                exported_at = excluded.exported_at
+        """, (table, max_row_id, max_change_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        # Changes below the mark will never be read again
+        cursor.execute("DELETE FROM change_log WHERE table_name = ? AND change_id <= ?", (table, max_change_id))
+
+    return filename, rows_written
+
+def print_export_progress(rows_written, elapsed):
+    """Prints a single, updating progress line with the export rate."""
+    rate = rows_written / elapsed if elapsed > 0 else 0
+    print(GREEN + f"\r⏳ {rows_written:,} rows written ({rate:,.0f} rows/s)" + RESET_ALL, end="", flush=True)
+
+def export_to_csv(conn, cursor):
+    """Exports clients or proposals to a CSV file, streaming rows in chunks."""
+    print(GREEN + "\n--- Export to CSV ---" + RESET_ALL)
+    print(GREEN + "[1] Export Clients" + RESET_ALL)
+    print(GREEN + "[2] Export Proposals" + RESET_ALL)
+    print(GREEN + "[3] Export Proposals with Client Name" + RESET_ALL)
+    print(GREEN + "[4] Incremental export (changes since the last one)" + RESET_ALL)
+    choice = input(GREEN + "Choose an option (1-4): " + RESET_ALL)
+
+    if choice == '4':
+        export_changes(conn)
+        return
+
+    sources = {'1': 'clients', '2': 'proposals', '3': 'proposals_with_client'}
+    if choice not in sources:
+        print(GREEN + "❌ Invalid option." + RESET_ALL)
+        return
+    source = sources[choice]
+
+    available = [name for name, _ in EXPORT_SOURCES[source][2]]
+    print(GREEN + f"Available columns: {', '.join(available)}" + RESET_ALL)
+    columns_text = input(GREEN + "Columns to export (comma-separated, blank for all): " + RESET_ALL)
+    columns = [name.strip() for name in columns_text.split(',') if name.strip()]
+    compress = input(GREEN + "Compress with gzip? (y/N): " + RESET_ALL).strip().lower() == 'y'
+
+    started = time.perf_counter()
+    try:
+        with snapshot_connection(conn) as reader:
+            filename, rows_written = export_source(reader.cursor(), source, columns=columns, compress=compress,
+                                                   progress=print_export_progress)
+    except ValueError as e:
+        print(GREEN + f"❌ Error: {e}" + RESET_ALL)
+        return
+    elapsed = time.perf_counter() - started
+
+    print()
+    print(GREEN + f"✅ {rows_written:,} rows from '{source}' exported to '{filename}' in {elapsed:.2f}s!" + RESET_ALL)
+
+def export_changes(conn):
+    """Writes delta files for clients and proposals with the rows changed since the previous run."""
+    for table in ['clients', 'proposals']:
+        filename, rows_written = export_delta(conn, table, progress=print_export_progress)
+        if rows_written:
+            print()
+        print(GREEN + f"✅ {rows_written:,} new or changed rows from '{table}' exported to '{filename}'." + RESET_ALL)
+
+def read_import_records(path):
+    """Yields (line number, record) from a CSV, JSON Lines or JSON array file.
+
+    CSV and JSON Lines files are read one line at a time; a JSON array has
+    to be parsed whole, so prefer JSON Lines for very large files. A line
+    that is not valid JSON is yielded as a None record.
+    """
+    import csv
+    lower_path = path.lower()
+    if lower_path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+    elif lower_path.endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+    elif lower_path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            raise ValueError("A JSON import file must contain a list of records.")
+        for index, record in enumerate(records, start=1):
+            yield index, record
+    else:
+        raise ValueError("Unsupported file type. Use .csv, .json, .jsonl or .ndjson.")
+
+def import_text(record, field):
+    """Returns a stripped text field from an import record, or None when it is missing or blank.
+
+    Raises ValueError when a JSON record holds a list or object in the field.
+    """
+    value = record.get(field)
+    if value is None:
+        return None
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"{field} must be a single value")
+    value = str(value).strip()
+    return value or None
+
+def prepare_client_import(record, now):
+    """Validates a client import record and returns its parameters for CLIENT_UPSERT_SQL."""
+    full_name = import_text(record, 'full_name')
+    if not full_name:
+        raise ValueError("full_name is required")
+    return (full_name, import_text(record, 'email'), import_text(record, 'phone'),
+            import_text(record, 'registration_date') or now)
+
+def prepare_proposal_import(record, now):
+    """Validates a proposal import record; the client reference is resolved later, per batch.
+
+    Returns (client_id, client_email, parameters for PROPOSAL_UPSERT_SQL without the client).
+    """
+    try:
+        proposal_id = import_text(record, 'proposal_id')
+        proposal_id = int(proposal_id) if proposal_id else None
+        client_id = import_text(record, 'client_id')
+        client_id = int(client_id) if client_id else None
+    except (TypeError, ValueError):
+        raise ValueError("proposal_id and client_id must be numbers")
+    client_email = import_text(record, 'client_email')
+    if client_id is None and client_email is None:
+        raise ValueError("client_id or client_email is required")
+
+    project_name = import_text(record, 'project_name')
+    if not project_name:
+        raise ValueError("project_name is required")
+    try:
+        value = float(import_text(record, 'proposal_value'))
+    except (TypeError, ValueError):
+        raise ValueError("proposal_value must be a number")
+    try:
+        status = int(import_text(record, 'status') or 1)
+    except (TypeError, ValueError):
+        raise ValueError("status must be a number")
+    if status not in STATUS_LABELS:
+        raise ValueError(f"invalid status {status}")
+
+    links = []
+    for field in ['proposal_link', 'questionnaire_link', 'contract_link']:
+        link = import_text(record, field)
+        if not validate_url(link):
+            raise ValueError(f"invalid URL in {field}")
+        links.append(link)
+
+    send_date = import_text(record, 'send_date') or now
+    update_date = import_text(record, 'update_date') or send_date
+    return client_id, client_email, [proposal_id, project_name, import_text(record, 'project_description'),
+                                     value, status, *links, send_date, update_date]
+
+def resolve_proposal_clients(cursor, batch):
+    """Resolves the client reference of a batch of prepared proposals with two set lookups.
+
+    Returns (rows ready for PROPOSAL_UPSERT_SQL, [(line number, reason, record)] of rejects).
+    """
+    client_ids = list({client_id for _, _, (client_id, _, _) in batch if client_id is not None})
+    emails = list({email for _, _, (client_id, email, _) in batch if client_id is None})
+    # The key sets travel as one JSON parameter, so no batch hits SQLite's bound-variable limit
+    known_ids = set()
+    if client_ids:
+        cursor.execute("SELECT client_id FROM clients WHERE client_id IN (SELECT value FROM json_each(?))",
+                       (json.dumps(client_ids),))
+        known_ids = {row[0] for row in cursor.fetchall()}
+    ids_by_email = {}
+    if emails:
+        cursor.execute("SELECT email, client_id FROM clients WHERE email IN (SELECT value FROM json_each(?))",
+                       (json.dumps(emails),))
+        ids_by_email = dict(cursor.fetchall())
+
+    rows = []
+    rejects = []
+    for line_number, record, (client_id, email, params) in batch:
+        if client_id is None:
+            client_id = ids_by_email.get(email)
+        elif client_id not in known_ids:
+            client_id = None
+        if client_id is None:
+            rejects.append((line_number, "client not found", record))
+            continue
+        rows.append((params[0], client_id, *params[1:]))
+    return rows, rejects
+
+def import_records(conn, kind, path, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Bulk-imports clients or proposals from a file with batched executemany upserts.
+
+    Each batch is validated, written and committed as one transaction.
+    Rejected records are written with their line number and reason to
+    `<path>.rejects.csv`. Returns a summary dict.
+    """
+    import csv
+    if kind not in ('clients', 'proposals'):
+        raise ValueError("kind must be 'clients' or 'proposals'")
+    prepare = prepare_client_import if kind == 'clients' else prepare_proposal_import
+    cursor = conn.cursor()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    summary = {"read": 0, "imported": 0, "rejected": 0, "rejects_file": None}
+    rejects_path = f"{path}.rejects.csv"
+    rejects_file = None
+    rejects_writer = None
+    started = time.perf_counter()
+
+    def write_rejects(rejects):
+        nonlocal rejects_file, rejects_writer
+        if not rejects:
+            return
+        if rejects_writer is None:
+            rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8')
+            rejects_writer = csv.writer(rejects_file)
+            rejects_writer.writerow(["line", "reason", "record"])
+            summary["rejects_file"] = rejects_path
+        for line_number, reason, record in rejects:
+            rejects_writer.writerow([line_number, reason, json.dumps(record, ensure_ascii=False, default=str)])
+        summary["rejected"] += len(rejects)
+
+    def flush(batch):
+        if kind == 'clients':
+            rows = [params for _, _, params in batch]
+        else:
+            rows, rejects = resolve_proposal_clients(cursor, batch)
+            write_rejects(rejects)
+        with transaction(conn):
+            cursor.executemany(CLIENT_UPSERT_SQL if kind == 'clients' else PROPOSAL_UPSERT_SQL, rows)
+        if kind == 'clients':
+            # Upserts may have changed clients already in the cache
+            _client_cache.clear()
+        summary["imported"] += len(rows)
+        if progress:
+            progress(summary["imported"], time.perf_counter() - started)
+
+    try:
+        batch = []
+        for line_number, record in read_import_records(path):
+            summary["read"] += 1
+            if not isinstance(record, dict):
+                write_rejects([(line_number, "record is not a JSON object", record)])
+                continue
+            try:
+                batch.append((line_number, record, prepare(record, now)))
+            except ValueError as e:
+                write_rejects([(line_number, str(e), record)])
+                continue
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+def import_data(conn):
+    """Guides the user through a bulk import of clients or proposals."""
+    print(GREEN + "\n--- Bulk Import ---" + RESET_ALL)
+    print(GREEN + "[1] Import Clients (full_name, email, phone)" + RESET_ALL)
+    print(GREEN + "[2] Import Proposals (client_id or client_email, project_name, proposal_value, ...)" + RESET_ALL)
+    choice = input(GREEN + "Choose an option (1 or 2): " + RESET_ALL)
+    if choice not in ['1', '2']:
+        print(GREEN + "❌ Invalid option." + RESET_ALL)
+        return
+    kind = 'clients' if choice == '1' else 'proposals'
+    path = input(GREEN + "Path of the .csv, .json or .jsonl file: " + RESET_ALL).strip()
+
+    try:
+        summary = import_records(conn, kind, path, progress=print_export_progress)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(GREEN + f"❌ Error importing data: {e}" + RESET_ALL)
+        return
+
+    if summary["imported"]:
+        print()
+    rate = summary["imported"] / summary["seconds"] if summary["seconds"] > 0 else 0
+    print(GREEN + f"✅ {summary['imported']:,} of {summary['read']:,} {kind} imported in {summary['seconds']:.2f}s ({rate:,.0f} rows/s)." + RESET_ALL)
+    if summary["rejected"]:
+        print(GREEN + f"⚠️ {summary['rejected']:,} records rejected; see '{summary['rejects_file']}' for the reasons." + RESET_ALL)
+
+# --- Proposal Archive ---
+
+def archive_path(db_path):
+    """Returns the archive database file that belongs to a database file."""
+    return os.path.splitext(db_path)[0] + ARCHIVE_SUFFIX
+
+def is_archive_attached(conn):
+    return conn.execute("SELECT 1 FROM pragma_database_list WHERE name = 'archive'").fetchone() is not None
+
+def create_all_proposals_view(conn):
+    """(Re)creates the all_proposals TEMP view: the live proposals plus, when the archive is attached, the archived ones.
+
+    Reports and exports read this view; everything else keeps working on the
+    small live table.
+    """
+    columns = ", ".join(PROPOSAL_COLUMNS)
+    select = f"SELECT {columns}, 0 AS archived FROM main.proposals"
+    if is_archive_attached(conn):
+        select += f" UNION ALL SELECT {columns}, 1 AS archived FROM archive.archived_proposals"
+    conn.execute("DROP VIEW IF EXISTS temp.all_proposals")
+    conn.execute(f"CREATE TEMP VIEW all_proposals AS {select}")
+
+def attach_archive(conn, path, read_only=False):
+    """Attaches the archive database as schema "archive", creating it unless read-only, and refreshes all_proposals."""
+    if not is_archive_attached(conn):
+        if conn.in_transaction:
+            raise ValueError("The archive cannot be attached inside a transaction.")
+        if read_only:
+            from urllib.parse import quote
+            conn.execute("ATTACH DATABASE ? AS archive", (f"file:{quote(os.path.abspath(path))}?mode=ro",))
+        else:
+            conn.execute("ATTACH DATABASE ? AS archive", (path,))
+            conn.execute("PRAGMA archive.journal_mode = WAL")
+            conn.execute(ARCHIVE_TABLE_SQL)
+    create_all_proposals_view(conn)
+
+def attach_existing_archive(conn):
+    """Attaches the archive if it was created since `conn` was opened. Returns whether it is attached.
+
+    Outside a transaction only: a transaction keeps the view it started with.
+    """
+    if not is_archive_attached(conn) and not conn.in_transaction:
+        db_file = database_file(conn)
+        if db_file and os.path.exists(archive_path(db_file)):
+            attach_archive(conn, archive_path(db_file))
+    return is_archive_attached(conn)
+
+def archive_after_days():
+    """Returns the archiving age in days from config.json, or the default."""
+    return int(read_config().get("archive_after_days", ARCHIVE_AFTER_DAYS))
+
+def archive_cutoff(older_than_days):
+    return (datetime.now() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+def count_archivable_proposals(cursor, older_than_days):
+    """Counts the closed proposals that archive_proposals would move."""
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM proposals
+        WHERE status IN ({", ".join("?" * len(ARCHIVE_STATUSES))}) AND update_date < ?
+    """, ARCHIVE_STATUSES + (archive_cutoff(older_than_days),))
+    return cursor.fetchone()[0]
+
+def archive_proposals(conn, older_than_days=None, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+    """Moves closed proposals not updated for `older_than_days` days from the live table to the archive.
+
+    Each batch is copied with INSERT OR IGNORE and then deleted from the live
+    table. SQLite only commits each attached WAL database atomically on its
+    own, so a run interrupted between the two files leaves copies behind;
+    the next run ignores them and finishes the deletes. AUTOINCREMENT keeps
+    archived ids from being reused. The rollups keep counting archived
+    proposals (they have no delete trigger) and their status history stays
+    in place. Returns a summary dict.
+    """
+    if older_than_days is None:
+        older_than_days = archive_after_days()
+    if older_than_days < 0:
+        raise ValueError("The archiving age must be zero or more days.")
+    db_file = database_file(conn)
+    if not db_file:
+        raise ValueError("In-memory databases cannot be archived.")
+    attach_archive(conn, archive_path(db_file))
+
+    cursor = conn.cursor()
+    cutoff = archive_cutoff(older_than_days)
+    columns = ", ".join(PROPOSAL_COLUMNS)
+    status_list = ", ".join("?" * len(ARCHIVE_STATUSES))
+    archived = 0
+    started = time.perf_counter()
+    while True:
+        with transaction(conn):
+            cursor.execute(f"""
+                SELECT json_group_array(proposal_id) FROM (
+                    SELECT proposal_id FROM proposals
+                    WHERE status IN ({status_list}) AND update_date < ?
+                    LIMIT ?
+                )
+            """, ARCHIVE_STATUSES + (cutoff, batch_size))
+            batch = cursor.fetchone()[0]
+            if batch == "[]":
+                break
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO archive.archived_proposals ({columns}, archived_at)
+                SELECT {columns}, ? FROM main.proposals WHERE proposal_id IN (SELECT value FROM json_each(?))
+            """, (now, batch))
+            cursor.execute("DELETE FROM main.proposals WHERE proposal_id IN (SELECT value FROM json_each(?))", (batch,))
+            archived += cursor.rowcount
+        if progress:
+            progress(archived, time.perf_counter() - started)
+
+    cursor.execute("SELECT COUNT(*) FROM proposals")
+    live = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM archive.archived_proposals")
+    in_archive = cursor.fetchone()[0]
+    return {
+        "archived": archived,
+        "live": live,
+        "in_archive": in_archive,
+        "archive": archive_path(db_file),
+        "seconds": time.perf_counter() - started,
+    }
+
+def archive_menu(conn, cursor):
+    """Moves old closed proposals to the archive database after confirmation."""
+    print(GREEN + "\n--- Archive Closed Proposals ---" + RESET_ALL)
+    default_days = archive_after_days()
+    days_text = input(GREEN + f"Archive Accepted/Rejected proposals not updated for how many days? [{default_days}]: " + RESET_ALL).strip()
+    try:
+        older_than_days = int(days_text) if days_text else default_days
+    except ValueError:
+        print(GREEN + "❌ Error: The number of days must be a whole number." + RESET_ALL)
+        return
+
+    candidates = count_archivable_proposals(cursor, older_than_days)
+    if not candidates:
+        print(GREEN + "ℹ️ No closed proposals are old enough to archive." + RESET_ALL)
+        return
+    confirm = input(GREEN + f"Move {candidates:,} proposals to the archive? They stay in reports and exports. (y/N): " + RESET_ALL)
+    if confirm.strip().lower() != 'y':
+        print(GREEN + "Archiving cancelled." + RESET_ALL)
+        return
+
+    def report_progress(archived, elapsed):
+        print(GREEN + f"\r⏳ {archived:,} of {candidates:,} proposals archived" + RESET_ALL, end="", flush=True)
+
+    try:
+        summary = archive_proposals(conn, older_than_days, progress=report_progress)
+    except (ValueError, sqlite3.Error) as e:
+        print(GREEN + f"❌ Error archiving proposals: {e}" + RESET_ALL)
+        return
+    print()
+    print(GREEN + f"✅ {summary['archived']:,} proposals archived to '{summary['archive']}' in {summary['seconds']:.2f}s." + RESET_ALL)
+    print(GREEN + f"ℹ️ {summary['live']:,} live proposals, {summary['in_archive']:,} archived." + RESET_ALL)
+
+# --- Backups ---
+
+def default_backup_path(db_path, suffix=""):
+    """Returns an unused, timestamped backup file name for a database, inside BACKUP_DIR."""
+    stem = f"{os.path.splitext(os.path.basename(db_path))[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+    path = os.path.join(BACKUP_DIR, stem + ".db")
+    counter = 1
+    while os.path.exists(path):
+        counter += 1
+        path = os.path.join(BACKUP_DIR, f"{stem}_{counter}.db")
+    return path
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback to abandon a stepped copy that keeps restarting."""
+
+def copy_database(source, target_path, name="main", pages=BACKUP_PAGES_PER_STEP, progress=None):
+    """Copies one schema of an open connection to a new file with the online backup API.
+
+    The copy is written to "<target>.part" and renamed when complete, so an
+    interrupted run never leaves a truncated file under the final name. It is
+    switched to a rollback journal, so the snapshot is a single file.
+    Returns the number of pages copied.
+    """
+    partial_path = target_path + ".part"
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+    copied = {"pages": 0, "remaining": None, "restarts": 0}
+
+    def step(status, remaining, total):
+        if copied["remaining"] is not None and remaining >= copied["remaining"]:
+            copied["restarts"] += 1
+            if copied["restarts"] > BACKUP_MAX_RESTARTS:
+                raise BackupRestarted()
+        copied.update(pages=total, remaining=remaining)
+        if progress:
+            progress(total - remaining, total)
+
+    target = sqlite3.connect(partial_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=step, name=name, sleep=BACKUP_BUSY_SLEEP)
+        except BackupRestarted:
+            copied["remaining"] = None
+            source.backup(target, pages=-1, progress=step, name=name, sleep=BACKUP_BUSY_SLEEP)
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+    os.replace(partial_path, target_path)
+    return copied["pages"]
+
+def verify_database(path, quick=False):
+    """Opens a database file read-only and checks its integrity.
+
+    `quick` runs PRAGMA quick_check, which skips the index contents and is
+    much faster on large files. Returns a summary dict with "ok" and the
+    problems found.
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+    started = time.perf_counter()
+    check = "quick_check" if quick else "integrity_check"
+    try:
+        conn = open_connection(path, read_only=True)
+    except sqlite3.DatabaseError as e:
+        return {"path": path, "ok": False, "check": check, "errors": [str(e)], "seconds": time.perf_counter() - started}
+    try:
+        errors = []
+        for schema in ("main", "archive") if is_archive_attached(conn) else ("main",):
+            try:
+                results = [row[0] for row in conn.execute(f"PRAGMA {schema}.{check}({BACKUP_MAX_ERRORS})")]
+            except sqlite3.DatabaseError as e:
+                results = [str(e)]
+            if results != ["ok"]:
+                errors.extend(results if schema == "main" else [f"archive: {error}" for error in results])
+        summary = {"path": path, "ok": not errors, "check": check, "errors": errors}
+        if not errors:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            summary["schema_version"] = get_schema_version(conn.cursor())
+            for table in ("clients", "proposals"):
+                summary[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if table in tables else None
+    finally:
+        conn.close()
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+def backup_database(conn, target_path=None, pages=BACKUP_PAGES_PER_STEP, verify=True, progress=None):
+    """Takes an online snapshot of the database, and of its archive when attached, while it stays in use.
+
+    The backup API copies `pages` pages per step. Writes made through `conn`
+    itself are carried into the copy as it goes; writes from other
+    connections restart it, up to BACKUP_MAX_RESTARTS times before the rest
+    is copied in a single step. Returns a summary dict.
+    """
+    if conn.in_transaction:
+        raise ValueError("A backup cannot start inside a transaction.")
+    db_file = database_file(conn)
+    if not db_file:
+        raise ValueError("In-memory databases cannot be backed up.")
+    target_path = target_path or default_backup_path(db_file)
+    if os.path.exists(target_path):
+        raise ValueError(f"'{target_path}' already exists.")
+    folder = os.path.dirname(target_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    started = time.perf_counter()
+    summary = {"backup": target_path, "pages": copy_database(conn, target_path, pages=pages, progress=progress)}
+    if attach_existing_archive(conn):
+        summary["archive"] = archive_path(target_path)
+        summary["archive_pages"] = copy_database(conn, summary["archive"], name="archive", pages=pages, progress=progress)
+    summary["bytes"] = os.path.getsize(target_path)
+    summary["seconds"] = time.perf_counter() - started
+    if verify:
+        summary["verify"] = verify_database(target_path)
+    return summary
+
+def restore_database(conn, backup_path, pages=BACKUP_PAGES_PER_STEP, progress=None):
+    """Replaces the contents of the open database (and archive) with a verified backup.
+
+    The backup is checked first and nothing is touched if it fails. The
+    current database is then saved as a "pre-restore" backup, so a restore
+    can itself be undone. A backup without an archive file empties the
+    current archive. Returns a summary dict.
+    """
+    if conn.in_transaction:
+        raise ValueError("A restore cannot start inside a transaction.")
+    check = verify_database(backup_path)
+    if not check["ok"]:
+        raise ValueError(f"'{backup_path}' failed the integrity check: {'; '.join(check['errors'][:5])}")
+    db_file = database_file(conn)
+    if not db_file:
+        raise ValueError("In-memory databases cannot be restored.")
+
+    started = time.perf_counter()
+    safety = backup_database(conn, default_backup_path(db_file, "_pre-restore"), pages=pages, verify=False)
+    # The backup API always writes the target's main schema: the archive is
+    # restored through a connection of its own, and seen through the attachment
+    restores = [(backup_path, conn)]
+    backup_archive = archive_path(backup_path)
+    archive_emptied = False
+    if os.path.exists(backup_archive):
+        attach_archive(conn, archive_path(db_file))
+        restores.append((backup_archive, sqlite3.connect(archive_path(db_file), timeout=DB_BUSY_TIMEOUT)))
+    elif attach_existing_archive(conn):
+        # A backup taken before anything was archived: its proposals are all
+        # live, so archived copies of them would be counted twice
+        with transaction(conn):
+            conn.execute("DELETE FROM archive.archived_proposals")
+        archive_emptied = True
+
+    def step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+
+    for path, target in restores:
+        source = sqlite3.connect(path)
+        try:
+            source.backup(target, pages=pages, progress=step, sleep=BACKUP_BUSY_SLEEP)
+        finally:
+            source.close()
+            if target is not conn:
+                target.close()
+
+    # The restored data may repeat version numbers the caches have already seen
+    _report_cache.clear()
+    clear_read_caches()
+    create_all_proposals_view(conn)
+    apply_migrations(conn)
+    return {
+        "restored": backup_path,
+        "archive_restored": len(restores) > 1,
+        "archive_emptied": archive_emptied,
+        "pre_restore_backup": safety["backup"],
+        "schema_version": check["schema_version"],
+        "clients": check["clients"],
+        "proposals": check["proposals"],
+        "seconds": time.perf_counter() - started,
+    }
+
+def print_backup_progress(done, total):
+    """Prints a single, updating progress line with the pages copied."""
+    percent = done / total * 100 if total else 100
+    print(GREEN + f"\r⏳ {done:,} of {total:,} pages copied ({percent:.0f}%)" + RESET_ALL, end="", flush=True)
+
+def backup_menu(conn, cursor):
+    """Backs up, verifies or restores the database from the menu."""
+    print(GREEN + "\n--- Backup and Restore ---" + RESET_ALL)
+    print(GREEN + "[1] Back up now" + RESET_ALL)
+    print(GREEN + "[2] Verify a backup" + RESET_ALL)
+    print(GREEN + "[3] Restore from a backup" + RESET_ALL)
+    choice = input(GREEN + "Choose an option (1-3): " + RESET_ALL)
+
+    try:
+        if choice == '1':
+            summary = backup_database(conn, progress=print_backup_progress)
+            print()
+            print(GREEN + f"✅ Backup saved to '{summary['backup']}' ({summary['bytes'] / 1048576:,.1f} MB) in {summary['seconds']:.2f}s." + RESET_ALL)
+            if summary["verify"]["ok"]:
+                print(GREEN + "✅ Integrity check passed." + RESET_ALL)
+            else:
+                print(GREEN + f"❌ Integrity check failed: {'; '.join(summary['verify']['errors'][:5])}" + RESET_ALL)
+        elif choice == '2':
+            path = input(GREEN + "Path of the backup file: " + RESET_ALL).strip()
+            summary = verify_database(path)
+            if summary["ok"]:
+                print(GREEN + f"✅ '{path}' is intact: schema v{summary['schema_version']}, {summary['clients']:,} clients, {summary['proposals']:,} proposals." + RESET_ALL)
+            else:
+                print(GREEN + f"❌ '{path}' is damaged:" + RESET_ALL)
+                for error in summary["errors"][:20]:
+                    print(GREEN + f"   {error}" + RESET_ALL)
+        elif choice == '3':
+            path = input(GREEN + "Path of the backup file: " + RESET_ALL).strip()
+            confirm = input(GREEN + "Replace ALL current data with this backup? (y/N): " + RESET_ALL)
+            if confirm.strip().lower() != 'y':
+                print(GREEN + "Restore cancelled." + RESET_ALL)
+                return
+            summary = restore_database(conn, path, progress=print_backup_progress)
+            print()
+            print(GREEN + f"✅ Restored {summary['proposals']:,} proposals and {summary['clients']:,} clients from '{path}'." + RESET_ALL)
+            print(GREEN + f"ℹ️ The previous data was saved to '{summary['pre_restore_backup']}'." + RESET_ALL)
+        else:
+            print(GREEN + "❌ Invalid option." + RESET_ALL)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print()
+        print(GREEN + f"❌ Error: {e}" + RESET_ALL)
+
+# --- Link Health Checks ---
+
+def open_link_connection(scheme, host, port, timeout=LINK_CHECK_TIMEOUT):
+    import http.client
+    if scheme == 'https':
+        return http.client.HTTPSConnection(host, port, timeout=timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+def check_link_group(urls, timeout=LINK_CHECK_TIMEOUT):
+    """Checks URLs that share a host over one reused keep-alive connection.
+
+    Each URL gets a HEAD request (GET when the server does not allow HEAD),
+    following redirects. Returns (url, ok, status code, error, elapsed ms)
+    tuples, with `ok` false for 4xx/5xx answers and unreachable links.
+    """
+    import http.client
+    from urllib.parse import urlsplit, urljoin
+    headers = {"User-Agent": f"PropPilot/{APP_VERSION} link-check"}
+    connection = None
+    connection_key = None
+    results = []
+    for url in urls:
+        started = time.perf_counter()
+        target = url
+        status_code = error = None
+        try:
+            for _ in range(LINK_CHECK_MAX_REDIRECTS + 1):
+                parts = urlsplit(target)
+                key = (parts.scheme.lower(), parts.hostname, parts.port)
+                path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+                for attempt in (1, 2):
+                    reused = connection is not None and connection_key == key
+                    if not reused:
+                        if connection is not None:
+                            connection.close()
+                        connection, connection_key = open_link_connection(*key, timeout=timeout), key
+                    try:
+                        connection.request("HEAD", path, headers=headers)
+                        response = connection.getresponse()
+                        response.read()
+                        if response.status in (405, 501):
+                            # Bodies of GET answers are not read, so this connection is not reused
+                            connection.request("GET", path, headers=headers)
+                            response = connection.getresponse()
+                            connection.close()
+                            connection = None
+                        break
+                    except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                        # A kept-alive connection the server has since closed: reconnect once
+                        connection.close()
+                        connection = None
+                        if not reused or attempt == 2:
+                            raise
+                location = response.getheader("Location")
+                if 300 <= response.status < 400 and location:
+                    target = urljoin(target, location)
+                    redirect = urlsplit(target)
+                    # Only redirects to another valid http(s) link are followed
+                    if redirect.scheme.lower() not in ('http', 'https') or not redirect.hostname or not validate_url(target):
+                        error = f"Invalid redirect: {location}"
+                        break
+                    continue
+                status_code = response.status
+                break
+            else:
+                error = "Too many redirects"
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            error = str(e) or e.__class__.__name__
+            if connection is not None:
+                connection.close()
+                connection = None
+        ok = error is None and (status_code < 400 or status_code in LINK_ALIVE_STATUSES)
+        results.append((url, int(ok), status_code, error, round((time.perf_counter() - started) * 1000, 1)))
+    if connection is not None:
+        connection.close()
+    return results
+
+def group_links_by_host(urls, connections_per_host=LINK_CHECK_HOST_CONNECTIONS):
+    """Splits http(s) URLs into per-host groups of at most `connections_per_host` per host; returns (groups, skipped)."""
+    from urllib.parse import urlsplit
+    hosts = {}
+    skipped = []
+    for url in urls:
+        try:
+            parts = urlsplit(url)
+            key = (parts.scheme.lower(), parts.hostname, parts.port)
+        except ValueError:
+            key = None
+        if key is None or key[0] not in ('http', 'https') or not key[1]:
+            skipped.append(url)
+            continue
+        hosts.setdefault(key, []).append(url)
+    groups = []
+    for host_urls in hosts.values():
+        count = min(connections_per_host, len(host_urls))
+        groups.extend(host_urls[index::count] for index in range(count))
+    # Biggest groups first, so one slow host does not start last and hold up the end of the audit
+    groups.sort(key=len, reverse=True)
+    return groups, skipped
+
+def audit_links(conn, force=False, ttl=LINK_CHECK_TTL, workers=LINK_CHECK_WORKERS, timeout=LINK_CHECK_TIMEOUT, progress=None):
+    """Checks the proposal, questionnaire and contract links concurrently and caches the results.
+
+    Links checked less than `ttl` seconds ago are skipped unless `force`.
+    Hosts are checked in parallel, each over at most LINK_CHECK_HOST_CONNECTIONS
+    reused connections. `progress`, if given, is called with (links checked,
+    links to check). Returns a summary dict.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    cursor = conn.cursor()
+    fresh_after = (datetime.now() - timedelta(seconds=ttl)).strftime('%Y-%m-%d %H:%M:%S')
+    skip_fresh = "" if force else "AND url NOT IN (SELECT url FROM link_checks WHERE checked_at >= :fresh_after)"
+    cursor.execute(f"""
+        SELECT DISTINCT url FROM (
+            SELECT proposal_link AS url FROM proposals
+            UNION ALL SELECT questionnaire_link FROM proposals
+            UNION ALL SELECT contract_link FROM proposals
+        )
+        WHERE url IS NOT NULL AND url != '' {skip_fresh}
+    """, {"fresh_after": fresh_after})
+    urls = [row[0] for row in cursor.fetchall()]
+    # Malformed links are recorded as broken without a network round trip
+    checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    valid = validate_urls(urls)
+    invalid = [(url, 0, None, "Invalid URL", 0, checked_at) for url, ok in zip(urls, valid) if not ok]
+    if invalid:
+        with transaction(conn):
+            conn.executemany(LINK_CHECK_UPSERT_SQL, invalid)
+        urls = [url for url, ok in zip(urls, valid) if ok]
+    groups, skipped = group_links_by_host(urls)
+
+    checked = broken = len(invalid)
+    # Malformed links count as checked, so they are part of the total as well
+    total = len(invalid) + len(urls) - len(skipped)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="link-check") as executor:
+        futures = {executor.submit(check_link_group, group, timeout): group for group in groups}
+        for future in as_completed(futures):
+            checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            try:
+                results = future.result()
+            except Exception as e:
+                # An unexpected failure marks its group as broken instead of aborting the audit
+                error = str(e) or e.__class__.__name__
+                results = [(url, 0, None, error, 0) for url in futures[future]]
+            with transaction(conn):
+                conn.executemany(LINK_CHECK_UPSERT_SQL, [result + (checked_at,) for result in results])
+            checked += len(results)
+            broken += sum(1 for result in results if not result[1])
+            if progress:
+                progress(checked, total)
+    return {"checked": checked, "broken": broken, "skipped": len(skipped)}
+
+def broken_links(cursor, urls):
+    """Returns the subset of `urls` that failed their last link check."""
+    if not urls:
+        return set()
+    cursor.execute("SELECT url FROM link_checks WHERE ok = 0 AND url IN (SELECT value FROM json_each(?))",
+                   (json.dumps(list(urls)),))
+    return {row[0] for row in cursor.fetchall()}
+
+def fetch_broken_link_report(cursor, limit=None):
+    """Returns (proposal ID, client, project, link kind, URL, status or error, checked at) for every broken link."""
+    query = " UNION ALL ".join(f"""
+        SELECT p.proposal_id, c.full_name, p.project_name, '{kind}', l.url, COALESCE(l.status_code, l.error), l.checked_at
+        FROM proposals p
+        JOIN link_checks l ON l.url = p.{column} AND l.ok = 0
+        JOIN clients c ON c.client_id = p.client_id
+    """ for kind, column in [("Proposal", "proposal_link"), ("Questionnaire", "questionnaire_link"), ("Contract", "contract_link")])
+    cursor.execute(query + " ORDER BY 1 DESC" + (" LIMIT ?" if limit else ""), (limit,) if limit else ())
+    return cursor.fetchall()
+
+def check_links(conn, cursor):
+    """Runs a link audit from the menu and lists the proposals with broken links."""
+    print(GREEN + "\n--- Check Proposal Links ---" + RESET_ALL)
+    force = input(GREEN + "Also recheck links checked in the last 24 hours? (y/N): " + RESET_ALL).strip().lower() == 'y'
+
+    def report_progress(done, total):
+        print(GREEN + f"\r⏳ {done:,} of {total:,} links checked" + RESET_ALL, end="", flush=True)
+
+    summary = audit_links(conn, force=force, progress=report_progress)
+    if summary["checked"]:
+        print()
+    print(GREEN + f"✅ {summary['checked']:,} links checked, {summary['broken']:,} broken." + RESET_ALL)
+    if summary["skipped"]:
+        print(GREEN + f"ℹ️ {summary['skipped']:,} non-HTTP links were skipped." + RESET_ALL)
+
+    rows = fetch_broken_link_report(cursor, limit=SEARCH_RESULT_LIMIT)
+    if rows:
+        print(GREEN + "\nProposals with broken links:" + RESET_ALL)
+        print(GREEN + tabulate(rows, headers=["ID", "Client", "Project", "Link", "URL", "Status/Error", "Checked"], tablefmt="grid") + RESET_ALL)
+
+def content_menu(conn, cursor):
+    """Sub-menu to manage content (standard replies) and send emails."""
+    while True:
+        clear_screen()
+        print(GREEN + "--- Content and Email Menu ---" + RESET_ALL)
+        print(GREEN + "[1] Add new standard reply" + RESET_ALL)
+        print(GREEN + "[2] View standard replies" + RESET_ALL)
+        print(GREEN + "[3] Send email with template" + RESET_ALL)
+        print(GREEN + "[4] Send email campaign" + RESET_ALL)
+        print(GREEN + "[5] View email outbox" + RESET_ALL)
+        print(GREEN + "[6] Edit standard reply" + RESET_ALL)
+        print(GREEN + "[0] Back" + RESET_ALL)
+        
+        option = input(GREEN + "\nChoose an option: " + RESET_ALL)
+        
+        if option == '1':
+            add_standard_reply(conn, cursor)
+        elif option == '2':
+            view_standard_replies(cursor)
+        elif option == '3':
+            send_email_with_template(conn, cursor)
+        elif option == '4':
+            send_campaign(conn, cursor)
+        elif option == '5':
+            view_outbox(cursor)
+        elif option == '6':
+            edit_standard_reply(conn, cursor)
+        elif option == '0':
+            break
+        else:
+            print(GREEN + "❌ Invalid option." + RESET_ALL)
+        
+        input(GREEN + "\nPress Enter to continue..." + RESET_ALL)
+
+def utilities_menu(conn, cursor):
+    """Sub-menu for settings and utilities."""
+    while True:
+        clear_screen()
+        print(GREEN + "--- Utilities Menu ---" + RESET_ALL)
+        print(GREEN + "[1] Configure email" + RESET_ALL)
+        print(GREEN + "[2] Export data to CSV" + RESET_ALL)
+        print(GREEN + "[3] Import data from CSV/JSON" + RESET_ALL)
+        print(GREEN + "[4] Diagnostics" + RESET_ALL)
+        print(GREEN + "[5] Check proposal links" + RESET_ALL)
+        print(GREEN + "[6] Archive closed proposals" + RESET_ALL)
+        print(GREEN + "[7] Backup and restore" + RESET_ALL)
+        print(GREEN + "[0] Back" + RESET_ALL)
+        
+        option = input(GREEN + "\nChoose an option: " + RESET_ALL)
+        
+        if option == '1':
+            configure_email()
+        elif option == '2':
+            export_to_csv(conn, cursor)
+        elif option == '3':
+            import_data(conn)
+        elif option == '4':
+            diagnostics_menu()
+        elif option == '5':
+            check_links(conn, cursor)
+        elif option == '6':
+            archive_menu(conn, cursor)
+        elif option == '7':
+            backup_menu(conn, cursor)
+        elif option == '0':
+            break
+        else:
+            print(GREEN + "❌ Invalid option." + RESET_ALL)
+        
+        input(GREEN + "\nPress Enter to continue..." + RESET_ALL)
+
+def diagnostics_menu():
+    """Shows the read cache hit rates, and the slowest SQL statements and SMTP timings recorded by the profiler."""
+    print(GREEN + "\n--- Diagnostics ---" + RESET_ALL)
+    rows = []
+    for name, cache in READ_CACHES.items():
+        stats = cache.stats()
+        rows.append((name, stats["entries"], stats["maxsize"], stats["hits"], stats["misses"], f"{stats['hit_rate']:.1f}%"))
+    print(GREEN + tabulate(rows, headers=["Cache", "Entries", "Size", "Hits", "Misses", "Hit Rate"], tablefmt="grid") + RESET_ALL)
+    if _profiler is None:
+        print(GREEN + f"ℹ️ Profiling is off. Start PropPilot with --profile (or {PROFILE_ENV_VAR}=1) to record timings." + RESET_ALL)
+        return
+    report = _profiler.snapshot()
+    print(GREEN + f"Recording since {report['started_at']}." + RESET_ALL)
+    if report["statements"]:
+        rows = [(s["calls"], f"{s['total_ms']:.1f}", f"{s['mean_ms']:.2f}", f"{s['max_ms']:.1f}", s["p95"], s["rows"],
+                 "yes" if s["full_scan"] else "", s["sql"][:70]) for s in report["statements"][:DIAGNOSTICS_TOP]]
+        print(GREEN + tabulate(rows, headers=["Calls", "Total ms", "Mean ms", "Max ms", "p95", "Rows", "Full Scan", "Statement"],
+                               tablefmt="grid") + RESET_ALL)
+    if report["timers"]:
+        rows = [(name, t["calls"], f"{t['total_ms']:.1f}", f"{t['mean_ms']:.2f}", f"{t['max_ms']:.1f}", t["p95"])
+                for name, t in report["timers"].items()]
+        print(GREEN + tabulate(rows, headers=["Operation", "Calls", "Total ms", "Mean ms", "Max ms", "p95"],
+                               tablefmt="grid") + RESET_ALL)
+
+    option = input(GREEN + "\n[1] Save as JSON  [2] Reset  [Enter] Back: " + RESET_ALL).strip()
+    if option == '1':
+        filename = input(GREEN + "File name (default: diagnostics.json): " + RESET_ALL).strip() or "diagnostics.json"
+        try:
+            dump_profile(filename)
+            print(GREEN + f"✅ Diagnostics saved to '{filename}'." + RESET_ALL)
+        except OSError as e:
+            print(GREEN + f"❌ Error saving diagnostics: {e}" + RESET_ALL)
+    elif option == '2':
+        _profiler.reset()
+        print(GREEN + "✅ Diagnostics reset." + RESET_ALL)
+
+# --- Main Menu Interface ---
+
+def main_menu(db_path=DB_PATH):
+    """Main loop that displays the menu and handles user actions."""
+    if missing_dependencies():
+        install_dependencies()
+    init_terminal()
+    conn, cursor = connect_db(db_path)
+    start_outbox_worker(db_path)
+    while True:
+        clear_screen()
+        print(BLACK + GREEN + "=" * 40)
+        print(GREEN + f"         PropPilot CLI v{APP_VERSION}         ")
+        print("=" * 40 + RESET_ALL)
+        print(GREEN + "\nWhat would you like to do today?" + RESET_ALL)
+        print(GREEN + "[1] Register new client" + RESET_ALL)
+        print(GREEN + "[2] Register new proposal" + RESET_ALL)
+        print(GREEN + "[3] View all proposals" + RESET_ALL)
+        print(GREEN + "[4] Update proposal status" + RESET_ALL)
+        print(GREEN + "[5] Reports" + RESET_ALL)
+        print(GREEN + "[6] Search data (client or project)" + RESET_ALL)
+        print(GREEN + "[7] Manage Content and Email" + RESET_ALL)
+        print(GREEN + "[8] Utilities and Settings" + RESET_ALL)
+        print(GREEN + "[9] Edit data" + RESET_ALL)
+        print(GREEN + "[0] Exit" + RESET_ALL)
+
+        option = input(GREEN + "\nChoose an option: " + RESET_ALL)
+
+        if option == '1':
+            add_client(conn, cursor)
+        elif option == '2':
+            add_proposal(conn, cursor)
+        elif option == '3':
+            view_proposals(cursor)
+        elif option == '4':
+            update_proposal_status(conn, cursor)
+        elif option == '5':
+            reports_menu(cursor)
+        elif option == '6':
+            search_data(cursor)
+        elif option == '7':
+            content_menu(conn, cursor)
+        elif option == '8':
+            utilities_menu(conn, cursor)
+        elif option == '9':
+            edit_menu(conn, cursor)
+        elif option == '0':
+            print(GREEN + "👋 Thank you for using PropPilot! See you soon!" + RESET_ALL)
+            break
+        else:
+            print(GREEN + "❌ Invalid option. Please try again." + RESET_ALL)
+        
+        if option in ['1', '2', '4']:
+            input(GREEN + "\nPress Enter to continue..." + RESET_ALL)
+        elif option not in ['0', '3', '5', '6', '7', '8', '9']:
+            input(GREEN + "\nPress Enter to continue..." + RESET_ALL)
+
+    stop_outbox_worker()
+    close_db(conn)
+
+def benchmark_startup(runs=10, budget_ms=STARTUP_BUDGET_MS):
+    """Times cold starts of the script (`--version`) in fresh interpreters against the startup budget."""
+    import subprocess
+    import statistics
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--version'], check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    result = {
+        "runs": runs,
+        "min_ms": round(min(timings), 1),
+        "median_ms": round(median, 1),
+        "max_ms": round(max(timings), 1),
+        "budget_ms": budget_ms,
+        "within_budget": median <= budget_ms,
+    }
+    print(json.dumps(result, indent=2))
+    return result
+
+# --- Benchmarks ---
+
+def synthetic_client_rows(rng, count, now):
+    """Yields `count` synthetic client rows in CLIENT_UPSERT_SQL order."""
+    for number in range(1, count + 1):
+        first, last = rng.choice(SYNTHETIC_FIRST_NAMES), rng.choice(SYNTHETIC_LAST_NAMES)
+        registered = now - timedelta(seconds=rng.randrange(3 * 365 * 86400))
+        yield (f"{first} {last}", f"{first}.{last}.{number}@example.com".lower(), f"+1 555 {number:07d}",
+               registered.strftime('%Y-%m-%d %H:%M:%S'))
+
+def synthetic_proposal_rows(rng, count, clients, now):
+    """Yields `count` synthetic new proposals in PROPOSAL_UPSERT_SQL order, sent over the last three years."""
+    statuses = list(STATUS_LABELS)
+    for number in range(1, count + 1):
+        sent = now - timedelta(seconds=rng.randrange(3 * 365 * 86400))
+        updated = min(now, sent + timedelta(seconds=rng.randrange(60 * 86400)))
+        status = rng.choices(statuses, weights=SYNTHETIC_STATUS_WEIGHTS)[0]
+        project = " ".join(rng.sample(SYNTHETIC_PROJECT_WORDS, 2))
+        yield (None, rng.randint(1, clients), project.capitalize(), f"Scope and estimate for the {project}.",
+               round(rng.lognormvariate(8, 0.8), 2), status,
+               f"https://docs.example.com/proposals/{number}" if rng.random() < 0.8 else None,
+               f"https://forms.example.com/q/{number}" if rng.random() < 0.5 else None,
+               f"https://sign.example.com/c/{number}" if status == 3 else None,
+               sent.strftime('%Y-%m-%d %H:%M:%S'), updated.strftime('%Y-%m-%d %H:%M:%S'))
+
+def insert_batches(conn, sql, rows, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Writes rows with executemany, one transaction per batch. Returns the number of rows written."""
+    import itertools
+    written = 0
+    started = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return written
+        with transaction(conn):
+            conn.executemany(sql, batch)
+        written += len(batch)
+        if progress:
+            progress(written, time.perf_counter() - started)
+
+def generate_benchmark_db(db_path, proposals, clients=None, seed=42, progress=None):
+    """Creates a database with the app's schema filled with synthetic clients and proposals.
+
+    Rows go through the normal schema, triggers included (search index,
+    rollups, version counters), so generation runs at bulk import speed:
+    about two minutes per million proposals. Returns a summary dict.
+    """
+    import random
+    if os.path.exists(db_path):
+        raise ValueError(f"{db_path} already exists; benchmark databases are always generated from scratch.")
+    clients = clients or max(1, proposals // 5)
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    started = time.perf_counter()
+    conn, _ = connect_db(db_path)
+    try:
+        insert_batches(conn, CLIENT_UPSERT_SQL, synthetic_client_rows(rng, clients, now), progress=progress)
+        insert_batches(conn, PROPOSAL_UPSERT_SQL, synthetic_proposal_rows(rng, proposals, clients, now),
+                       progress=progress)
+    finally:
+        close_db(conn)
+    return {"database": db_path, "clients": clients, "proposals": proposals, "seed": seed,
+            "seconds": round(time.perf_counter() - started, 1)}
+
+def time_operation(operation, repeat):
+    """Runs an operation `repeat` times and returns (timing stats in ms, result of the last run)."""
+    import statistics
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = operation()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }, result
+
+def benchmark_url_validation(count=200000, hosts=500, seed=0):
+    """Compares the URL validation throughput of is_valid_url, validate_url and validate_urls.
+
+    The synthetic mix is mostly links on a few hundred hosts, plus IP
+    addresses with ports, repeated links and invalid URLs. Also checks the
+    mix and URL_EDGE_CASES for links on which validate_url and is_valid_url
+    disagree, reported under "mismatches" (and "results_match" is false).
+    """
+    import random
+    rng = random.Random(seed)
+    host_names = [f"{rng.choice(SYNTHETIC_PROJECT_WORDS)}{number}.example.com" for number in range(hosts)]
+    urls = []
+    for number in range(count):
+        roll = rng.random()
+        if roll < 0.85:
+            urls.append(f"https://{rng.choice(host_names)}/proposals/{number}?ref=email")
+        elif roll < 0.90:
+            urls.append(f"http://192.168.{number % 256}.{number // 256 % 256}:8080/p/{number}")
+        elif roll < 0.95 and urls:
+            urls.append(rng.choice(urls))
+        else:
+            urls.append(rng.choice([f"https://{rng.choice(host_names)}/a b", f"www.example.com/{number}",
+                                    f"https://{rng.choice(host_names)}?", f"https://-bad{number}.com/"]))
+
+    results = {"urls": count, "distinct_hosts": hosts}
+    expected = None
+    for name, validate in [("is_valid_url", lambda: [is_valid_url(url) for url in urls]),
+                           ("validate_url", lambda: [validate_url(url) for url in urls]),
+                           ("validate_urls", lambda: validate_urls(urls))]:
+        is_valid_url_host.cache_clear()
+        started = time.perf_counter()
+        answers = validate()
+        elapsed = time.perf_counter() - started
+        results[name] = {"seconds": round(elapsed, 3), "urls_per_s": round(count / elapsed)}
+        expected = answers if expected is None else expected
+        results["results_match"] = results.get("results_match", True) and answers == expected
+    results["speedup"] = round(results["is_valid_url"]["seconds"] / results["validate_urls"]["seconds"], 1)
+
+    is_valid_url_host.cache_clear()
+    mismatches = [url for url in URL_EDGE_CASES + urls if validate_url(url) != is_valid_url(url)]
+    results["edge_cases"] = len(URL_EDGE_CASES)
+    results["mismatches"] = mismatches[:20]
+    results["results_match"] = results["results_match"] and not mismatches
+    return results
+
+def run_benchmarks(db_path=DB_PATH, repeat=5, insert_rows=10000, renders=100000):
+    """Times the hot paths of the app against a database and returns machine-readable results.
+
+    Covers the queries behind the proposal browser, search and reports, a
+    full CSV export, a bulk insert (rolled back afterwards, so the database
+    is left as it was), template rendering and URL validation. Export and
+    insert run once.
+    """
+    import platform
+    import random
+    import tempfile
+    conn, cursor = connect_db(db_path)
+    results = {}
+    try:
+        client_count = cursor.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+        proposal_count = cursor.execute("SELECT COUNT(*) FROM proposals").fetchone()[0]
+        if not proposal_count:
+            raise ValueError("The benchmark needs a database with proposals; create one with bench-generate.")
+
+        results["proposal_page_first"], _ = time_operation(lambda: fetch_proposal_page(cursor), repeat)
+        middle = cursor.execute("""
+            SELECT update_date, proposal_id FROM proposals
+            ORDER BY update_date DESC, proposal_id DESC LIMIT 1 OFFSET ?
+        """, (proposal_count // 2,)).fetchone()
+        results["proposal_page_middle"], _ = time_operation(lambda: fetch_proposal_page(cursor, after=middle), repeat)
+        results["proposal_page_by_status"], _ = time_operation(lambda: fetch_proposal_page(cursor, status=3), repeat)
+
+        common_term = cursor.execute("SELECT full_name FROM clients ORDER BY client_id LIMIT 1").fetchone()[0].split()[-1]
+        rare_term = cursor.execute("SELECT email FROM clients ORDER BY client_id DESC LIMIT 1").fetchone()[0]
+        results["search_common_term"], _ = time_operation(lambda: search_records(cursor, common_term), repeat)
+        results["search_rare_term"], _ = time_operation(lambda: search_records(cursor, rare_term), repeat)
+
+        results["report_compute"], _ = time_operation(lambda: compute_report_metrics(cursor), repeat)
+        get_report_metrics(cursor)
+        results["report_cached"], _ = time_operation(lambda: get_report_metrics(cursor), repeat)
+        results["trend_report"], _ = time_operation(lambda: compute_trend_report(cursor, 'month'), repeat)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "proposals.csv")
+            stats, (_, rows) = time_operation(lambda: export_source(cursor, 'proposals_with_client', filename), 1)
+        stats["rows_per_s"] = round(rows / (stats["median_ms"] / 1000))
+        results["csv_export"] = stats
+
+        rows = list(synthetic_proposal_rows(random.Random(0), insert_rows, client_count, datetime.now()))
+        def bulk_insert():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(PROPOSAL_UPSERT_SQL, rows)
+            finally:
+                conn.rollback()
+        stats, _ = time_operation(bulk_insert, 1)
+        stats["rows"] = insert_rows
+        stats["rows_per_s"] = round(insert_rows / (stats["median_ms"] / 1000))
+        results["bulk_insert"] = stats
+
+        client = cursor.execute("SELECT full_name, email, phone FROM clients LIMIT 1").fetchone()
+        proposal = cursor.execute("""
+            SELECT project_name, project_description, proposal_value, status, proposal_link, questionnaire_link, contract_link
+            FROM proposals LIMIT 1
+        """).fetchone()
+        values = template_values(client, proposal)
+        compiled = compile_template(BENCHMARK_TEMPLATE)
+        def render_many():
+            for _ in range(renders):
+                render_template(compiled, values)
+        stats, _ = time_operation(render_many, repeat)
+        stats["renders"] = renders
+        stats["renders_per_s"] = round(renders / (stats["median_ms"] / 1000))
+        results["template_render"] = stats
+        results["url_validation"] = benchmark_url_validation()
+    finally:
+        close_db(conn)
+
+    return {
+        "app_version": APP_VERSION,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "run_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "database": {
+            "path": db_path,
+            "size_mb": round(os.path.getsize(db_path) / 1048576, 1),
+            "clients": client_count,
+            "proposals": proposal_count,
+        },
+        "results": results,
+    }
+
+# --- HTTP API ---
+
+class APIError(Exception):
+    """An error answered to an API client with the given HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+_api_local = threading.local()
+_api_connections = []
+_api_connections_lock = threading.Lock()
+
+def api_connection(db_path):
+    """Returns the calling worker thread's own connection, opening it on first use."""
+    conn = getattr(_api_local, "conn", None)
+    if conn is None:
+        conn = open_connection(db_path, check_same_thread=False)
+        _api_local.conn = conn
+        with _api_connections_lock:
+            _api_connections.append(conn)
+    return conn
+
+def close_api_connections():
+    """Closes the connections opened by the API workers."""
+    with _api_connections_lock:
+        while _api_connections:
+            _api_connections.pop().close()
+
+def query_int(query, name, default=None):
+    """Reads an integer query string parameter, answering 400 when it is not one."""
+    if name not in query:
+        return default
+    try:
+        return int(query[name][-1])
+    except ValueError:
+        raise APIError(400, f"'{name}' must be an integer.")
+
+def api_page_size(query):
+    return max(1, min(query_int(query, "limit", PROPOSAL_PAGE_SIZE), API_MAX_PAGE_SIZE))
+
+def api_list_clients(conn, match, query, body):
+    cursor = conn.cursor()
+    limit = api_page_size(query)
+    cursor.execute("SELECT client_id, full_name, email, phone FROM clients WHERE client_id > ? ORDER BY client_id LIMIT ?",
+                   (query_int(query, "after", 0), limit))
+    clients = [dict(zip(CLIENT_FIELDS, row)) for row in cursor.fetchall()]
+    next_after = clients[-1]["client_id"] if len(clients) == limit else None
+    return 200, {"clients": clients, "next": next_after}
+
+def api_get_client(conn, match, query, body):
+    row = get_client(conn.cursor(), int(match[1]))
+    if row is None:
+        raise APIError(404, "Client not found.")
+    return 200, dict(zip(CLIENT_FIELDS, row))
+
+def body_text(body, name, required=False):
+    """Reads a string field of the JSON body (None when absent), answering 400 when it is not a string."""
+    value = body.get(name)
+    if value is not None and not isinstance(value, str):
+        raise APIError(400, f"'{name}' must be a string.")
+    if required and not value:
+        raise APIError(400, f"'{name}' is required.")
+    return value
+
+def api_add_client(conn, match, query, body):
+    full_name = body_text(body, "full_name", required=True)
+    email, phone = body_text(body, "email"), body_text(body, "phone")
+    with transaction(conn):
+        client_id = insert_client(conn.cursor(), full_name, email, phone)
+    return 201, {"client_id": client_id}
+
+def api_list_proposals(conn, match, query, body):
+    """Lists proposals most recently updated first; `next` is the `after` value of the following page."""
+    after = None
+    if "after" in query:
+        update_date, _, proposal_id = query["after"][-1].rpartition(",")
+        if not update_date or not proposal_id.isdigit():
+            raise APIError(400, "'after' must be '<update_date>,<proposal_id>'.")
+        after = (update_date, int(proposal_id))
+    limit = api_page_size(query)
+    rows = fetch_proposal_page(conn.cursor(), after=after, status=query_int(query, "status"),
+                               client_id=query_int(query, "client_id"), page_size=limit)
+    next_after = ",".join(map(str, page_key(rows[-1]))) if len(rows) == limit else None
+    return 200, {"proposals": [dict(zip(PROPOSAL_PAGE_FIELDS, row)) for row in rows], "next": next_after}
+
+def api_get_proposal(conn, match, query, body):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT p.proposal_id, c.full_name, p.project_name, p.proposal_value, p.status, p.update_date,
+               p.proposal_link, p.questionnaire_link, p.contract_link, p.client_id, p.project_description, p.send_date
+        FROM proposals p
+        JOIN clients c ON p.client_id = c.client_id
+        WHERE p.proposal_id = ?
+    """, (int(match[1]),))
+    row = cursor.fetchone()
+    if row is None:
+        raise APIError(404, "Proposal not found.")
+    return 200, dict(zip(PROPOSAL_PAGE_FIELDS + ["client_id", "project_description", "send_date"], row))
+
+def api_add_proposal(conn, match, query, body):
+    try:
+        client_id, value = int(body["client_id"]), float(body["proposal_value"])
+    except (KeyError, TypeError, ValueError):
+        raise APIError(400, "'client_id', 'project_name' and a numeric 'proposal_value' are required.")
+    project_name = body_text(body, "project_name", required=True)
+    texts = [body_text(body, name) or "" for name in ("project_description", "proposal_link", "questionnaire_link",
+                                                      "contract_link")]
+    with transaction(conn):
+        proposal_id = insert_proposal(conn.cursor(), client_id, project_name, texts[0], value, *texts[1:])
+    return 201, {"proposal_id": proposal_id}
+
+def api_set_status(conn, match, query, body):
+    """Sets the status of the proposal in the path, or of every proposal listed in `ids`."""
+    ids = [int(match[1])] if match.lastindex else body.get("ids")
+    if not isinstance(ids, list) or not all(isinstance(proposal_id, int) for proposal_id in ids):
+        raise APIError(400, "'ids' must be a list of proposal IDs.")
+    if not isinstance(body.get("status"), int):
+        raise APIError(400, "'status' must be a status number.")
+    with transaction(conn):
+        updated = set_proposal_status(conn.cursor(), ids, body.get("status"))
+    if match.lastindex and not updated:
+        raise APIError(404, "Proposal not found.")
+    return 200, {"updated": updated}
+
+def api_search(conn, match, query, body):
+    term = query.get("q", [""])[-1]
+    limit = max(1, min(query_int(query, "limit", SEARCH_RESULT_LIMIT), API_MAX_PAGE_SIZE))
+    return 200, cli_search(conn, {"term": term, "limit": limit})
+
+def api_report(conn, match, query, body):
+    return 200, get_report_metrics(conn.cursor())
+
+def api_velocity_report(conn, match, query, body):
+    return 200, {"velocity": compute_velocity_report(conn.cursor())}
+
+def api_trend_report(conn, match, query, body):
+    period_type = query.get("period", ["month"])[-1]
+    if period_type not in ("month", "week"):
+        raise APIError(400, "'period' must be 'month' or 'week'.")
+    periods = max(1, min(query_int(query, "periods", TREND_PERIODS), 520))
+    return 200, {"trends": compute_trend_report(conn.cursor(), period_type, periods)}
+
+# (method, path pattern, handler) of every API endpoint
+API_ROUTES = [
+    ("GET", re.compile(r"/clients"), api_list_clients),
+    ("POST", re.compile(r"/clients"), api_add_client),
+    ("GET", re.compile(r"/clients/(\d+)"), api_get_client),
+    ("GET", re.compile(r"/proposals"), api_list_proposals),
+    ("POST", re.compile(r"/proposals"), api_add_proposal),
+    ("GET", re.compile(r"/proposals/(\d+)"), api_get_proposal),
+    ("POST", re.compile(r"/proposals/(\d+)/status"), api_set_status),
+    ("POST", re.compile(r"/proposals/status"), api_set_status),
+    ("GET", re.compile(r"/search"), api_search),
+    ("GET", re.compile(r"/report"), api_report),
+    ("GET", re.compile(r"/report/trends"), api_trend_report),
+    ("GET", re.compile(r"/report/velocity"), api_velocity_report),
+]
+
+def dispatch_api_request(conn, method, path, query, body):
+    """Routes one request to its handler and returns (HTTP status, JSON-serializable payload)."""
+    allowed = False
+    for route_method, pattern, handler in API_ROUTES:
+        match = pattern.fullmatch(path.rstrip("/") or "/")
+        if not match:
+            continue
+        if route_method != method:
+            allowed = True
+            continue
+        try:
+            return handler(conn, match, query, body)
+        except APIError as e:
+            return e.status, {"error": str(e)}
+        except sqlite3.IntegrityError as e:
+            return 409, {"error": str(e)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            # Anything unexpected still gets an HTTP answer instead of a dropped connection
+            return 500, {"error": f"Internal error: {type(e).__name__}: {e}"}
+    if allowed:
+        return 405, {"error": "Method not allowed."}
+    return 404, {"error": "Not found."}
+
+def create_api_server(db_path=DB_PATH, host=API_HOST, port=API_PORT, workers=API_WORKERS, quiet=True):
+    """Creates the HTTP/JSON API server; call serve_forever() to run it and server_close() when done.
+
+    Connections are handed to a fixed pool of worker threads rather than a
+    thread per request, and every worker keeps its own WAL connection, so
+    reads run in parallel while writes queue on the SQLite write lock.
+    """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import urlsplit, parse_qs
+    from concurrent.futures import ThreadPoolExecutor
+
+    class APIRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = f"PropPilot/{APP_VERSION}"
+        timeout = API_IDLE_TIMEOUT
+        # Headers and body go out as separate writes; with Nagle on, the body
+        # waits for the client's delayed ACK (~40 ms per request).
+        disable_nagle_algorithm = True
+
+        def handle_request(self, method):
+            url = urlsplit(self.path)
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length < 0:
+                    raise ValueError
+            except ValueError:
+                # The body length is unknown, so the connection cannot be reused
+                self.close_connection = True
+                status, payload = 400, {"error": "Invalid Content-Length header."}
+            else:
+                try:
+                    body = json.loads(self.rfile.read(length)) if length else {}
+                except ValueError:
+                    body = None
+                if not isinstance(body, dict):
+                    status, payload = 400, {"error": "The request body must be a JSON object."}
+                else:
+                    try:
+                        conn = api_connection(db_path)
+                    except sqlite3.Error as e:
+                        status, payload = 503, {"error": f"Database unavailable: {e}"}
+                    else:
+                        status, payload = dispatch_api_request(conn, method, url.path, parse_qs(url.query), body)
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self.handle_request("GET")
+
+        def do_POST(self):
+            self.handle_request("POST")
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    class PooledHTTPServer(HTTPServer):
+        def __init__(self, address, handler):
+            super().__init__(address, handler)
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.process_request_in_worker, request, client_address)
+
+        def process_request_in_worker(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+        def server_close(self):
+            super().server_close()
+            self.pool.shutdown(wait=True)
+            close_api_connections()
+
+    # Applies pending migrations once, before the workers open their own connections
+    conn, _ = connect_db(db_path)
+    close_db(conn)
+    return PooledHTTPServer((host, port), APIRequestHandler)
+
+def serve_api(db_path=DB_PATH, host=API_HOST, port=API_PORT, workers=API_WORKERS):
+    """Runs the HTTP API until interrupted."""
+    server = create_api_server(db_path, host, port, workers, quiet=False)
+    print(f"PropPilot API listening on http://{host}:{server.server_address[1]} ({workers} workers)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def benchmark_api(db_path=DB_PATH, url=None, clients=8, duration=10.0, workers=API_WORKERS, write_ratio=0.0):
+    """Measures sustained API requests per second from concurrent keep-alive clients.
+
+    Without `url` a server is started in-process on a free port, so clients
+    and server share the interpreter; point `url` at a separate `serve`
+    process for numbers free of that contention. The request mix is mostly
+    proposal pages, plus single proposals, searches and reports; `write_ratio`
+    turns that share of requests into status updates.
+    """
+    import http.client
+    import random
+    import statistics
+    from urllib.parse import urlsplit
+
+    server = None
+    if url is None:
+        server = create_api_server(db_path, port=0, workers=workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://{API_HOST}:{server.server_address[1]}"
+    target = urlsplit(url)
+
+    conn = open_connection(db_path, read_only=True)
+    proposal_ids = [row[0] for row in conn.execute("SELECT proposal_id FROM proposals ORDER BY random() LIMIT 1000")]
+    terms = [row[0].split()[0] for row in conn.execute("SELECT full_name FROM clients ORDER BY random() LIMIT 100") if row[0]]
+    conn.close()
+    if not proposal_ids:
+        raise ValueError("The benchmark needs a database with proposals.")
+
+    def next_request(rng):
+        roll = rng.random()
+        if roll < write_ratio:
+            return "POST", f"/proposals/{rng.choice(proposal_ids)}/status", {"status": rng.choice(list(STATUS_LABELS))}
+        roll = rng.random()
+        if roll < 0.6:
+            return "GET", f"/proposals?status={rng.choice(list(STATUS_LABELS))}", None
+        if roll < 0.85:
+            return "GET", f"/proposals/{rng.choice(proposal_ids)}", None
+        if roll < 0.95 and terms:
+            return "GET", f"/search?q={rng.choice(terms)}&limit=20", None
+        return "GET", "/report", None
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run_client(seed):
+        rng = random.Random(seed)
+        http_conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            method, path, body = next_request(rng)
+            started = time.perf_counter()
+            try:
+                http_conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                                  headers={"Content-Type": "application/json"})
+                response = http_conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                http_conn.close()
+                http_conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+                continue
+            local_latencies.append((time.perf_counter() - started) * 1000)
+        http_conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run_client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    latencies.sort()
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))], 2) if latencies else None
+    return {
+        "url": url,
+        "clients": clients,
+        "server_workers": workers if server is not None else None,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": errors[0],
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 2) if latencies else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        },
+    }
+
+# --- Command-Line Interface ---
+
+def cli_add_client(conn, params):
+    with transaction(conn):
+        client_id = insert_client(conn.cursor(), params['name'], params.get('email'), params.get('phone'))
+    return {"client_id": client_id}
+
+def cli_add_proposal(conn, params):
+    with transaction(conn):
+        proposal_id = insert_proposal(
+            conn.cursor(), int(params['client_id']), params['project'], params.get('description') or "",
+            float(params['value']), params.get('proposal_link') or "", params.get('questionnaire_link') or "",
+            params.get('contract_link') or "")
+    return {"proposal_id": proposal_id}
+
+def cli_set_status(conn, params):
+    ids = params['ids'] if isinstance(params['ids'], list) else [params['ids']]
+    with transaction(conn):
+        updated = set_proposal_status(conn.cursor(), [int(proposal_id) for proposal_id in ids], int(params['status']))
+    return {"updated": updated}
+
+def cli_bulk_update(conn, params):
+    changes = {}
+    for assignment in params.get('set') or []:
+        column, separator, value = assignment.partition('=')
+        if not separator:
+            raise ValueError(f"Expected FIELD=VALUE, got '{assignment}'.")
+        changes[column.strip()] = value
+    if params.get('set_status') is not None:
+        changes['status'] = params['set_status']
+    filters = {
+        "proposal_ids": params.get('ids') or None,
+        "status": params.get('where_status'),
+        "client_id": params.get('where_client'),
+        "older_than_days": params.get('older_than'),
+    }
+    matched, to_update = count_matching_proposals(conn.cursor(), changes, **filters)
+    if params.get('dry_run'):
+        return {"matched": matched, "updated": 0, "would_update": to_update}
+    with transaction(conn):
+        updated = bulk_update_proposals(conn.cursor(), changes, **filters)
+    return {"matched": matched, "updated": updated}
+
+def cli_search(conn, params):
+    clients, proposals = search_records(conn.cursor(), params['term'], int(params.get('limit') or SEARCH_RESULT_LIMIT))
+    return {
+        "clients": [dict(zip(CLIENT_FIELDS, row)) for row in clients],
+        "proposals": [dict(zip(PROPOSAL_SEARCH_FIELDS, row)) for row in proposals],
+    }
+
+def cli_report(conn, params):
+    with snapshot_connection(conn) as reader:
+        if params.get('velocity'):
+            return {"velocity": compute_velocity_report(reader.cursor())}
+        if params.get('trends'):
+            return {"trends": compute_trend_report(reader.cursor(), params['trends'])}
+        return get_report_metrics(reader.cursor())
+
+def cli_export(conn, params):
+    columns = [name.strip() for name in (params.get('columns') or "").split(',') if name.strip()]
+    if params.get('delta'):
+        if params['source'] not in ('clients', 'proposals'):
+            raise ValueError("Delta exports are available for 'clients' and 'proposals' only.")
+        filename, rows_written = export_delta(conn, params['source'], params.get('output'), bool(params.get('gzip')))
+    else:
+        with snapshot_connection(conn) as reader:
+            filename, rows_written = export_source(reader.cursor(), params['source'], params.get('output'), columns,
+                                                   bool(params.get('gzip')))
+    return {"file": filename, "rows": rows_written}
+
+def cli_import(conn, params):
+    return import_records(conn, params['kind'], params['path'])
+
+def cli_check_links(conn, params):
+    summary = audit_links(conn, force=bool(params.get('force')), workers=int(params.get('workers') or LINK_CHECK_WORKERS),
+                          timeout=float(params.get('timeout') or LINK_CHECK_TIMEOUT))
+    fields = ["proposal_id", "client_name", "project_name", "link", "url", "status", "checked_at"]
+    summary["broken_links"] = [dict(zip(fields, row)) for row in fetch_broken_link_report(conn.cursor())]
+    return summary
+
+def cli_archive(conn, params):
+    older_than = params.get('older_than')
+    return archive_proposals(conn, None if older_than is None else int(older_than))
+
+def cli_backup(conn, params):
+    return backup_database(conn, params.get('path'), int(params.get('pages') or BACKUP_PAGES_PER_STEP),
+                           not params.get('no_verify'))
+
+def cli_restore(conn, params):
+    return restore_database(conn, params['path'], int(params.get('pages') or BACKUP_PAGES_PER_STEP))
+
+# Subcommands that manage whole database files; they cannot run inside the
+# transaction of a batch
+NON_BATCH_COMMANDS = {"archive", "backup", "restore"}
+
+# Operations available as subcommands and as "op" values of `batch` input lines
+CLI_COMMANDS = {
+    "add-client": cli_add_client,
+    "add-proposal": cli_add_proposal,
+    "set-status": cli_set_status,
+    "bulk-update": cli_bulk_update,
+    "search": cli_search,
+    "report": cli_report,
+    "export": cli_export,
+    "import": cli_import,
+    "check-links": cli_check_links,
+    "archive": cli_archive,
+    "backup": cli_backup,
+    "restore": cli_restore,
+}
+
+def print_json(data):
+    print(json.dumps(data, ensure_ascii=False, default=str))
+
+def cli_batch(conn, atomic=False):
+    """Runs JSON Lines operations from stdin in one transaction, printing one JSON result per line.
+
+    Each line is an object with an "op" (a subcommand name) and its options,
+    e.g. {"op": "set-status", "ids": [4, 8], "status": 3}. Each operation runs
+    in its own savepoint: a failed one is undone, reported and skipped, unless
+    `atomic` is set: then the first failure rolls everything back. Returns
+    the exit code.
+    """
+    failures = 0
+    try:
+        with transaction(conn):
+            for line_number, line in enumerate(sys.stdin, start=1):
+                if not line.strip():
+                    continue
+                conn.execute("SAVEPOINT batch_op")
+                try:
+                    params = json.loads(line)
+                    op = params.get('op')
+                    handler = CLI_COMMANDS.get(op) if op not in NON_BATCH_COMMANDS else None
+                    if handler is None:
+                        raise ValueError(f"Unknown op: {op}" if op not in NON_BATCH_COMMANDS
+                                         else f"'{op}' cannot run inside a batch.")
+                    result = handler(conn, params)
+                except (ValueError, TypeError, KeyError, AttributeError, OSError, sqlite3.Error) as e:
+                    conn.execute("ROLLBACK TO batch_op")
+                    conn.execute("RELEASE batch_op")
+                    failures += 1
+                    message = f"Missing field: {e}" if isinstance(e, KeyError) else str(e)
+                    print_json({"line": line_number, "ok": False, "error": message})
+                    if atomic:
+                        raise
+                else:
+                    conn.execute("RELEASE batch_op")
+                    print_json({"line": line_number, "ok": True, "result": result})
+    except (ValueError, TypeError, KeyError, AttributeError, OSError, sqlite3.Error):
+        print_json({"ok": False, "error": "Batch rolled back."})
+    return 1 if failures else 0
+
+def build_cli_parser():
+    """Builds the argparse parser of the non-interactive interface."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="propPilot",
+        description="PropPilot command-line interface. Run without arguments for the interactive menu.")
+    parser.add_argument('--version', action='version', version=f"PropPilot {APP_VERSION}")
+    parser.add_argument('--db', default=DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument('--install-deps', action='store_true', help="install the libraries used by the menu and exit")
+    parser.add_argument('--benchmark-startup', action='store_true', help="time cold starts against the startup budget")
+    parser.add_argument('--profile', nargs='?', const="", metavar='FILE',
+                        help="record SQL and SMTP timings (shown under Utilities > Diagnostics); with FILE, save them there as JSON at exit")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    command = commands.add_parser('add-client', help="register a client")
+    command.add_argument('--name', required=True)
+    command.add_argument('--email')
+    command.add_argument('--phone')
+
+    command = commands.add_parser('add-proposal', help="register a proposal (status Sent)")
+    command.add_argument('--client-id', type=int, required=True)
+    command.add_argument('--project', required=True)
+    command.add_argument('--description', default="")
+    command.add_argument('--value', type=float, required=True)
+    command.add_argument('--proposal-link', default="")
+    command.add_argument('--questionnaire-link', default="")
+    command.add_argument('--contract-link', default="")
+
+    command = commands.add_parser('set-status', help="set the status of one or more proposals")
+    command.add_argument('ids', type=int, nargs='+')
+    command.add_argument('--status', type=int, required=True, choices=sorted(STATUS_LABELS))
+
+    command = commands.add_parser('bulk-update', help="change many proposals, by ID list or filter, in one transaction")
+    command.add_argument('--ids', type=int, nargs='+', help="proposal IDs")
+    command.add_argument('--where-status', type=int, choices=sorted(STATUS_LABELS), help="only proposals in this status")
+    command.add_argument('--where-client', type=int, metavar='CLIENT_ID', help="only proposals of this client")
+    command.add_argument('--older-than', type=int, metavar='DAYS', help="only proposals not updated for DAYS days")
+    command.add_argument('--set-status', type=int, choices=sorted(STATUS_LABELS), help="new status")
+    command.add_argument('--set', action='append', metavar='FIELD=VALUE',
+                         help=f"new field value; fields: {', '.join(BULK_EDITABLE_COLUMNS)}")
+    command.add_argument('--dry-run', action='store_true', help="only count the proposals that would change")
+
+    command = commands.add_parser('search', help="full-text search of clients and proposals")
+    command.add_argument('term')
+    command.add_argument('--limit', type=int, default=SEARCH_RESULT_LIMIT)
+
+    command = commands.add_parser('report', help="performance metrics, or trends with --trends")
+    command.add_argument('--trends', choices=['month', 'week'])
+    command.add_argument('--velocity', action='store_true', help="days per stage and conversion funnel")
+
+    command = commands.add_parser('export', help="export a data set to CSV")
+    command.add_argument('source', choices=sorted(EXPORT_SOURCES))
+    command.add_argument('--output')
+    command.add_argument('--columns', help="comma-separated column names")
+    command.add_argument('--gzip', action='store_true')
+    command.add_argument('--delta', action='store_true', help="only rows changed since the previous delta export")
+
+    command = commands.add_parser('import', help="bulk import a CSV, JSON or JSON Lines file")
+    command.add_argument('kind', choices=['clients', 'proposals'])
+    command.add_argument('path')
+
+    command = commands.add_parser('check-links', help="check stored links and list the broken ones")
+    command.add_argument('--force', action='store_true', help="also recheck links whose cached result is still fresh")
+    command.add_argument('--workers', type=int, default=LINK_CHECK_WORKERS)
+    command.add_argument('--timeout', type=float, default=LINK_CHECK_TIMEOUT)
+
+    command = commands.add_parser('archive', help="move old Accepted/Rejected proposals to the archive database")
+    command.add_argument('--older-than', type=int, metavar='DAYS',
+                         help=f"only proposals not updated for DAYS days (default: config.json \"archive_after_days\" or {ARCHIVE_AFTER_DAYS})")
+
+    command = commands.add_parser('backup', help="take an online snapshot of the database while it is in use")
+    command.add_argument('path', nargs='?', help=f"backup file (default: a timestamped file in {BACKUP_DIR}/)")
+    command.add_argument('--pages', type=int, default=BACKUP_PAGES_PER_STEP, help="pages copied per step")
+    command.add_argument('--no-verify', action='store_true', help="skip the integrity check of the copy")
+
+    command = commands.add_parser('verify', help="check the integrity of a database or backup file")
+    command.add_argument('path')
+    command.add_argument('--quick', action='store_true', help="PRAGMA quick_check instead of the full integrity_check")
+
+    command = commands.add_parser('restore', help="replace the database with a verified backup")
+    command.add_argument('path')
+    command.add_argument('--pages', type=int, default=BACKUP_PAGES_PER_STEP, help="pages copied per step")
+
+    command = commands.add_parser('batch', help="run JSON Lines operations from stdin in one transaction")
+    command.add_argument('--atomic', action='store_true', help="roll everything back on the first failure")
+
+    command = commands.add_parser('bench-generate', help="create a synthetic database for benchmarks")
+    command.add_argument('path')
+    command.add_argument('--proposals', type=int, default=100000)
+    command.add_argument('--clients', type=int, help="default: one client per five proposals")
+    command.add_argument('--seed', type=int, default=42)
+
+    command = commands.add_parser('bench', help="time the hot paths against the --db database")
+    command.add_argument('--repeat', type=int, default=5)
+    command.add_argument('--insert-rows', type=int, default=10000)
+    command.add_argument('--renders', type=int, default=100000)
+    command.add_argument('--output', help="also write the JSON results to this file")
+
+    command = commands.add_parser('bench-urls', help="compare URL validation throughput; exits 1 if the validators disagree")
+    command.add_argument('--count', type=int, default=200000)
+
+    command = commands.add_parser('serve', help="run the local HTTP/JSON API")
+    command.add_argument('--host', default=API_HOST)
+    command.add_argument('--port', type=int, default=API_PORT)
+    command.add_argument('--workers', type=int, default=API_WORKERS)
+
+    command = commands.add_parser('api-bench', help="measure sustained API requests per second")
+    command.add_argument('--url', help="benchmark a running server instead of an in-process one")
+    command.add_argument('--clients', type=int, default=8, help="concurrent keep-alive clients")
+    command.add_argument('--duration', type=float, default=10.0, help="seconds to run")
+    command.add_argument('--workers', type=int, default=API_WORKERS, help="workers of the in-process server")
+    command.add_argument('--write-ratio', type=float, default=0.0, help="share of requests that update a status")
+    return parser
+
+def main(argv=None):
+    """Runs the command-line interface, or the interactive menu when no arguments are given."""
+    argv = sys.argv[1:] if argv is None else argv
+    profile_target = os.environ.get(PROFILE_ENV_VAR)
+    if profile_target:
+        enable_profiling(None if profile_target == "1" else profile_target)
+    if not argv:
+        main_menu()
+        return 0
+
+    args = build_cli_parser().parse_args(argv)
+    if args.profile is not None:
+        enable_profiling(args.profile)
+    if args.install_deps:
+        install_dependencies()
+        return 0
+    if args.benchmark_startup:
+        return 0 if benchmark_startup()["within_budget"] else 1
+    if args.command is None:
+        main_menu(args.db)
+        return 0
+    try:
+        if args.command == 'bench-generate':
+            def report_progress(rows, elapsed):
+                print(f"{rows:,} rows in {elapsed:.1f}s", file=sys.stderr, flush=True)
+            print_json(generate_benchmark_db(args.path, args.proposals, args.clients, args.seed, report_progress))
+            return 0
+        if args.command == 'bench':
+            results = json.dumps(run_benchmarks(args.db, args.repeat, args.insert_rows, args.renders), indent=2)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(results + "\n")
+            print(results)
+            return 0
+        if args.command == 'bench-urls':
+            results = benchmark_url_validation(args.count)
+            print(json.dumps(results, indent=2))
+            return 0 if results["results_match"] else 1
+        if args.command == 'verify':
+            summary = verify_database(args.path, args.quick)
+            print_json(summary)
+            return 0 if summary["ok"] else 1
+        if args.command == 'serve':
+            serve_api(args.db, args.host, args.port, args.workers)
+            return 0
+        if args.command == 'api-bench':
+            print(json.dumps(benchmark_api(args.db, args.url, args.clients, args.duration, args.workers,
+                                           args.write_ratio), indent=2))
+            return 0
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print_json({"ok": False, "error": str(e)})
+        return 1
+
+    try:
+        conn, _ = connect_db(args.db)
+    except sqlite3.Error as e:
+        print_json({"ok": False, "error": str(e)})
+        return 1
+    try:
+        if args.command == 'batch':
+            return cli_batch(conn, args.atomic)
+        try:
+            print_json(CLI_COMMANDS[args.command](conn, vars(args)))
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print_json({"ok": False, "error": str(e)})
+            return 1
+        return 0
+    finally:
+        close_db(conn)
+
+if __name__ == "__main__":
+    sys.exit(main())
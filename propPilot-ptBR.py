@@ -1,45 +1,60 @@
+# Só módulos leves da biblioteca padrão são importados aqui. Os mais pesados
+# (smtplib, email, csv, tabulate, colorama) são importados dentro das funções
+# que os usam.
 import sqlite3
 from datetime import datetime
 import os
 import re
-import subprocess
 import sys
-import smtplib
-from email.mime.text import MIMEText
 import json
-import csv
+
+# Bibliotecas de terceiros usadas pela interface interativa
+DEPENDENCIAS = ['colorama', 'tabulate']
 
 # --- Funções de Instalação de Dependências ---
 
+def dependencias_ausentes():
+    """Retorna as bibliotecas necessárias que não estão instaladas, sem importá-las."""
+    import importlib.util
+    return [dep for dep in DEPENDENCIAS if importlib.util.find_spec(dep) is None]
+
 def instalar_dependencias():
     """Instala bibliotecas necessárias se elas não estiverem instaladas."""
-    dependencias = ['colorama', 'tabulate']
-    for dep in dependencias:
-        try:
-            __import__(dep)
+    import subprocess
+    for dep in DEPENDENCIAS:
+        if dep not in dependencias_ausentes():
             print(f"✅ Biblioteca '{dep}' já está instalada.")
-        except ImportError:
-            print(f"Instalando a biblioteca '{dep}'...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
-                print(f"✅ Biblioteca '{dep}' instalada com sucesso!")
-            except subprocess.CalledProcessError:
-                print(f"❌ Erro ao instalar a biblioteca '{dep}'. Por favor, instale manualmente com 'pip install {dep}' e execute o script novamente.")
-                sys.exit(1)
-
-instalar_dependencias()
-
-# A partir daqui, as bibliotecas estão garantidas de estarem instaladas
-from colorama import init, Fore, Back, Style
-from tabulate import tabulate
+            continue
+        print(f"Instalando a biblioteca '{dep}'...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
+            print(f"✅ Biblioteca '{dep}' instalada com sucesso!")
+        except subprocess.CalledProcessError:
+            print(f"❌ Erro ao instalar a biblioteca '{dep}'. Por favor, instale manualmente com 'pip install {dep}' e execute o script novamente.")
+            sys.exit(1)
+
+def tabulate(*args, **kwargs):
+    """Formata uma tabela com a biblioteca tabulate, importada no primeiro uso."""
+    from tabulate import tabulate as formatar_tabela
+    return formatar_tabela(*args, **kwargs)
+
+def iniciar_terminal():
+    """Permite que o colorama traduza as cores ANSI nos consoles do Windows."""
+    try:
+        from colorama import init
+    except ImportError:
+        return
+    init(autoreset=True)
 
-# Inicializa o colorama para funcionar em todos os sistemas
-init(autoreset=True)
+def limpar_tela():
+    """Limpa o terminal com uma sequência de escape ANSI em vez de abrir um shell."""
+    print("\033[2J\033[H", end="", flush=True)
 
-# Cores e estilos para simular um terminal verde antigo
-GREEN = Fore.GREEN
-BLACK = Back.BLACK
-RESET_ALL = Style.RESET_ALL
+# Cores e estilos para simular um terminal verde antigo (os códigos ANSI de
+# Fore.GREEN, Back.BLACK e Style.RESET_ALL do colorama)
+GREEN = '\033[32m'
+BLACK = '\033[40m'
+RESET_ALL = '\033[0m'
 
 # Expressão regular para validação de URL
 URL_PATTERN = re.compile(
@@ -50,6 +65,9 @@ URL_PATTERN = re.compile(
     r'(?::\d+)?'
     r'(?:/?|[/?]\S+)$', re.IGNORECASE)
 
+# Quantidade de linhas lidas do banco por lote durante a exportação para CSV
+TAMANHO_LOTE_EXPORTACAO = 5000
+
 # --- Funções de Banco de Dados e Lógica do Script ---
 
 def conectar_banco():
@@ -142,6 +160,8 @@ def enviar_email(destinatario, assunto, corpo):
         print(GREEN + "❌ Erro: Configurações de e-mail não encontradas. Por favor, configure-as primeiro." + RESET_ALL)
         return False
     
+    import smtplib
+    from email.mime.text import MIMEText
     try:
         msg = MIMEText(corpo)
         msg['Subject'] = assunto
@@ -162,7 +182,7 @@ def enviar_email(destinatario, assunto, corpo):
 def menu_conteudos(conn, cursor):
     """Sub-menu para gerenciar conteúdos (respostas padronizadas) e enviar e-mail."""
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        limpar_tela()
         print(GREEN + "--- Menu de Conteúdos e E-mail ---" + RESET_ALL)
         print(GREEN + "[1] Adicionar nova resposta padronizada" + RESET_ALL)
         print(GREEN + "[2] Visualizar respostas padronizadas" + RESET_ALL)
@@ -227,13 +247,18 @@ def exportar_para_csv(conn, cursor):
         print(GREEN + "❌ Opção inválida." + RESET_ALL)
         return
     
+    import csv
     headers = [desc[0] for desc in cursor.description]
-    dados = cursor.fetchall()
 
+    # Grava em lotes para que o uso de memória não cresça com o tamanho da tabela
     with open(nome_arquivo, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         writer.writerow(headers)
-        writer.writerows(dados)
+        while True:
+            dados = cursor.fetchmany(TAMANHO_LOTE_EXPORTACAO)
+            if not dados:
+                break
+            writer.writerows(dados)
     
     print(GREEN + f"✅ Dados da tabela '{tabela}' exportados para '{nome_arquivo}' com sucesso!" + RESET_ALL)
 
@@ -241,7 +266,7 @@ def exportar_para_csv(conn, cursor):
 def menu_utilidades(conn, cursor):
     """Sub-menu para configurações e utilidades."""
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        limpar_tela()
         print(GREEN + "--- Menu de Utilidades ---" + RESET_ALL)
         print(GREEN + "[1] Configurar e-mail" + RESET_ALL)
         print(GREEN + "[2] Exportar dados para CSV" + RESET_ALL)
@@ -267,9 +292,12 @@ def menu_utilidades(conn, cursor):
 
 def menu_principal():
     """Loop principal que exibe o menu e gerencia as ações do usuário."""
+    if dependencias_ausentes():
+        instalar_dependencias()
+    iniciar_terminal()
     conn, cursor = conectar_banco()
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        limpar_tela()
         print(BLACK + GREEN + "=" * 40)
         print(GREEN + "  Gerenciador de Propostas DevJC v4.0  ")
         print("=" * 40 + RESET_ALL)
@@ -316,4 +344,7 @@ def menu_principal():
     conn.close()
 
 if __name__ == "__main__":
-    menu_principal()
+    if "--install-deps" in sys.argv[1:]:
+        instalar_dependencias()
+    else:
+        menu_principal()